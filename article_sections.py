@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+セクション並列の記事生成とステッチング
+記事構成（冒頭～結論）の各セクションを共通コンテキストから独立に生成し、
+決まった順序・見出しで1本の記事 HTML に連結する
+
+- 出力トークンは1回の呼び出しの中では逐次生成されるため、セクションごとに並列呼び出しして短縮する
+- 失敗したセクションだけを再生成（記事全体はやり直さない）
+- 各セクションのプロンプトには、そのセクションが使うデータブロック（inputs）だけを含める
+  LLM キャッシュのキーは使った入力だけで決まるため、入力が変わっていないセクションは
+  朝・夕の版をまたいで再利用され、入力が動いたセクションだけが再生成される
+  （long_term は固定クエリのマクロ文脈 background だけを使うため、ニュースが変わってもキーが変わらない）
+- このセクション単位の再利用は ARTICLE_GENERATION_MODE=sections の時だけ働く
+  （既定の single / ストリーミング生成は記事全体が1つのキャッシュキー）
+- 再生成後も失敗したセクションは記事から除外する（全セクション失敗時は空の辞書）
+"""
+
+import os
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# セクション生成の同時実行数と、失敗セクションの再生成回数
+SECTION_WORKERS = int(os.getenv('SECTION_WORKERS', '8'))
+SECTION_RETRIES = int(os.getenv('SECTION_RETRIES', '1'))
+
+# 記事構成（順序どおりに連結する）。heading が None のセクションは見出しなしで先頭に置く
+# inputs: セクションが使う実行ごとのデータブロック（ファンダメンタルズはプレフィックスに常に含む）
+# static: LLM では生成せず、呼び出し元が本文を用意するセクション（config・市場データからの決定的レンダリング）
+SECTION_SPECS = [
+    {
+        'key': 'intro',
+        'heading': None,
+        'instruction': '本日のトレンドと、その背景にあるマクロ的な文脈を述べる導入文',
+        'chars': 250,
+        'inputs': ['trends', 'scores', 'macro', 'news'],
+    },
+    {
+        'key': 'institutional',
+        'heading': '機関投資家参入の進捗',
+        'instruction': 'BlackRock、Franklin Templeton などの動き（具体例を示す）',
+        'chars': 300,
+        'inputs': ['news'],
+    },
+    {
+        'key': 'regulation',
+        'heading': '規制フレームワークの整備状況',
+        'instruction': 'SEC、金融庁、FCAなどの最新ガイダンス',
+        'chars': 300,
+        'inputs': ['macro', 'news'],
+    },
+    {
+        'key': 'technology',
+        'heading': '技術・インフラの進化',
+        'instruction': 'スケーラビリティ、セキュリティ、相互運用性',
+        'chars': 250,
+        'inputs': ['news'],
+    },
+    {
+        'key': 'ecosystem',
+        'heading': 'エコシステム提携と実需の形成',
+        'instruction': 'TradFi との統合、大手機関との協業（なぜこれが重要か説明）',
+        'chars': 300,
+        'inputs': ['news'],
+    },
+    {
+        'key': 'projects',
+        'heading': '主要なRWAプロジェクト群',
+        'instruction': '厳選50銘柄の分類別スナップショット',
+        'static': True,
+    },
+    {
+        'key': 'long_term',
+        'heading': '長期投資家向けの視点',
+        'instruction': '価格投機ではなく実需ベースの判断軸',
+        'chars': 250,
+        'inputs': ['background'],
+    },
+    {
+        'key': 'conclusion',
+        'heading': '結論',
+        'instruction': 'RWAセクターへの構造的な見立て',
+        'chars': 200,
+        'inputs': ['trends', 'scores', 'macro', 'news'],
+    },
+]
+
+# inputs に関わらず全セクションに含めるデータブロック（記事ごとの切り口）
+COMMON_BLOCKS = {'angle'}
+
+_CODE_FENCE = re.compile(r'^```[a-zA-Z]*\s*|\s*```$')
+_LEADING_HEADING = re.compile(r'^\s*<h[1-3][^>]*>.*?</h[1-3]>\s*', re.DOTALL)
+
+
+def build_section_prompt(context: tuple, spec: dict, specs: list = None) -> tuple:
+    """
+    共通コンテキスト (プレフィックス, データブロック) に「このセクションだけを書く」指示を付ける
+    記事構成と共通の制約はプレフィックス側に置き、全セクションで同じプレフィックスを共有する
+    データブロックは spec['inputs'] に挙げたものだけを含める
+    """
+    specs = specs or SECTION_SPECS
+    prefix, blocks = context
+    suffix = ''.join(
+        text for name, text in blocks.items()
+        if name in COMMON_BLOCKS or name in spec.get('inputs', blocks)
+    )
+    outline = '\n'.join(
+        f"        {i}. {s['heading'] or '冒頭'} - {s['instruction']}"
+        + ('（市場データから自動生成するため執筆不要）' if s.get('static') else '')
+        for i, s in enumerate(specs, 1)
+    )
+    name = spec['heading'] or '冒頭'
+
+    section_prefix = f"""{prefix}
+        【記事構成（全体）】
+{outline}
+
+        【制約】
+        - 日本語
+        - 見出し（h1～h3）は付けない。本文は <p>・<ul>・<li>・<strong> タグのみで記述
+        - 依頼されたセクション以外の内容には触れない
+        - 価格予測や『煽り』表現は避け、事実ベースの分析
+        - 機関投資家・長期投資家向けの専門的かつ冷静な内容
+        """
+
+    section_suffix = f"""{suffix}
+        【今回の依頼】
+        上記の記事構成のうち「{name}」セクションの本文だけを、{spec['chars']}文字程度で執筆してください。
+        内容: {spec['instruction']}
+        """
+    return section_prefix, section_suffix
+
+
+def clean_section(text: str) -> str:
+    """モデル出力からコードフェンスと先頭の見出しを取り除く（見出しはステッチ時に統一して付ける）"""
+    text = _CODE_FENCE.sub('', (text or '').strip())
+    return _LEADING_HEADING.sub('', text, count=1).strip()
+
+
+def stitch_sections(sections: dict, specs: list = None) -> str:
+    """セクション本文を記事構成の順に連結（欠けたセクションは飛ばす）"""
+    parts = []
+    for spec in specs or SECTION_SPECS:
+        body = sections.get(spec['key'])
+        if not body:
+            continue
+        if spec['heading']:
+            parts.append(f"<h2>{spec['heading']}</h2>")
+        parts.append(body)
+    return '\n\n'.join(parts)
+
+
+def generate_sections(generate, context: tuple, specs: list = None,
+                      max_workers: int = SECTION_WORKERS,
+                      retries: int = SECTION_RETRIES) -> dict:
+    """
+    static でない全セクションを並列生成し、{key: 本文} を返す
+    context は (プレフィックス, データブロック)。generate(prompt, spec) はセクション本文を返す関数
+    （prompt も (プレフィックス, サフィックス)。空文字・例外は失敗扱い）
+    失敗したセクションだけを最大 retries 回まで再生成する
+    """
+    specs = specs or SECTION_SPECS
+    sections = {}
+
+    def _run(spec):
+        try:
+            return clean_section(generate(build_section_prompt(context, spec, specs), spec))
+        except Exception as e:
+            logger.warning(f"セクション生成失敗 [{spec['key']}]: {str(e)[:50]}")
+            return ''
+
+    pending = [spec for spec in specs if not spec.get('static')]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                logger.info(f"失敗したセクションを再生成（{attempt}回目）: {', '.join(s['key'] for s in pending)}")
+            results = list(executor.map(_run, pending))
+            for spec, body in zip(pending, results):
+                if body:
+                    sections[spec['key']] = body
+            pending = [spec for spec in pending if spec['key'] not in sections]
+
+    if pending:
+        logger.warning(f"セクションを除外して記事を構成: {', '.join(s['key'] for s in pending)}")
+    return sections
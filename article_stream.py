@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ストリーミング記事生成用のインクリメンタル HTML ライター
+Gemini の stream=True 応答のチャンクを到着順にディスクへ書き出し、
+締め切り（デッドライン）で打ち切った場合も、それまでの本文を閉じタグ付きで公開する
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from html.parser import HTMLParser
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# 閉じタグを持たない要素
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'source', 'track', 'wbr',
+}
+
+_END_OF_STREAM = object()
+
+
+class _OpenTagTracker(HTMLParser):
+    """書き出し済みの HTML で閉じられていないタグを追跡"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.stack:
+            # 対応する開始タグまでをまとめて閉じる（入れ子の崩れを許容）
+            index = len(self.stack) - 1 - self.stack[::-1].index(tag)
+            del self.stack[index:]
+
+    def closing_tags(self) -> str:
+        return ''.join(f'</{tag}>' for tag in reversed(self.stack))
+
+
+def iter_with_deadline(source, deadline: float):
+    """
+    source を別スレッドで消費し、time.monotonic() が deadline を超えたら打ち切る
+    停止したストリーム（チャンクが来ない状態）も締め切りで中断できる
+    source にイテラブルを返す関数を渡すと、その呼び出し（リクエスト送信・最初のチャンク待ち）も締め切りに含める
+    """
+    chunks = queue.Queue()
+
+    def _consume():
+        try:
+            iterable = source() if callable(source) else source
+            for item in iterable:
+                chunks.put(item)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_END_OF_STREAM)
+
+    threading.Thread(target=_consume, name='article-stream', daemon=True).start()
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError('ストリーミング生成が締め切りを超えました')
+        try:
+            item = chunks.get(timeout=remaining)
+        except queue.Empty:
+            raise TimeoutError('ストリーミング生成が締め切りを超えました')
+        if item is _END_OF_STREAM:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+class StreamingPageWriter:
+    """
+    head → 本文チャンク → tail の順に一時ファイルへ書き出し、完了時に本番パスへ置き換える
+    with ブロック内で write() を呼ぶ。例外・打ち切り時も書き出し済みの本文で公開する
+    insert=(正規表現, HTML) を渡すと、本文中で最初に一致した h2 見出しの直前に HTML を差し込む
+    （一致しないまま終わった場合は本文の末尾に追加）
+    """
+
+    def __init__(self, path, head: str, tail: str, insert: tuple = None):
+        self.path = Path(path)
+        self.head = head
+        self.tail = tail
+        self.text = []
+        self.truncated = False
+        self._pending = ''
+        self._insert = insert
+        self._tracker = _OpenTagTracker()
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._partial_path = self.path.with_suffix(self.path.suffix + '.partial')
+        self._file = open(self._partial_path, 'w', encoding='utf-8')
+        self._file.write(self.head)
+        self._file.flush()
+        return self
+
+    def write(self, chunk: str):
+        """チャンクを追記（途中で切れているタグは次のチャンクまで保留）"""
+        if not chunk:
+            return
+        self.text.append(chunk)
+        buffer = self._pending + chunk
+        cut = buffer.rfind('<')
+        if cut != -1 and buffer.find('>', cut) == -1:
+            ready, self._pending = buffer[:cut], buffer[cut:]
+        else:
+            ready, self._pending = buffer, ''
+
+        # 差し込み待ちの間は、閉じていない h2 見出しを見出し全体が届くまで保留
+        if self._insert:
+            heading = ready.rfind('<h2')
+            if heading != -1 and ready.find('</h2>', heading) == -1:
+                ready, self._pending = ready[:heading], ready[heading:] + self._pending
+
+        self._emit(ready)
+
+    def _emit(self, text: str):
+        if self._insert:
+            pattern, html = self._insert
+            match = pattern.search(text)
+            if match:
+                text = text[:match.start()] + html + text[match.start():]
+                self._insert = None
+        if text:
+            self._file.write(text)
+            self._file.flush()
+            self._tracker.feed(text)
+
+    @property
+    def article_text(self) -> str:
+        return ''.join(self.text)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.truncated = True
+            logger.warning(f'ストリーミング生成を中断: {str(exc)[:80]}')
+
+        if not self.truncated and self._pending:
+            self._emit(self._pending)
+
+        self._file.write(self._tracker.closing_tags())
+        if self._insert and self.text:
+            self._file.write(self._insert[1])
+        self._file.write(self.tail)
+        self._file.close()
+
+        if self.text:
+            os.replace(self._partial_path, self.path)
+        else:
+            # 本文が1文字も届かなかった場合は公開せず、呼び出し元のフォールバックに任せる
+            self._partial_path.unlink(missing_ok=True)
+
+        # TimeoutError（締め切り）は打ち切りとして扱い、呼び出し元へは伝播させない
+        return exc_type is not None and issubclass(exc_type, TimeoutError)
@@ -404,6 +404,26 @@ TARGET_DOMAINS = [
     "nansen.ai"
 ]
 
+# ===== ターゲットドメインの RSS/Atom フィード =====
+# 公開フィードが無いドメインは載せない（検索のファンアウトでのみ取得）
+TARGET_FEEDS = {
+    "thetokenizer.com": "https://www.thetokenizer.com/feed/",
+    "blockworks.co": "https://blockworks.co/feed",
+    "dlnews.com": "https://www.dlnews.com/arc/outboundfeeds/rss/",
+    "theblock.co": "https://www.theblock.co/rss.xml",
+    "coindesk.com": "https://www.coindesk.com/arc/outboundfeeds/rss/",
+    "cointelegraph.com": "https://cointelegraph.com/rss",
+    "thedefiant.io": "https://thedefiant.io/api/feed",
+    "cryptoslate.com": "https://cryptoslate.com/feed/",
+    "decrypt.co": "https://decrypt.co/feed",
+    "ledgerinsights.com": "https://www.ledgerinsights.com/feed/",
+    "bloomberg.com": "https://feeds.bloomberg.com/markets/news.rss",
+    "ft.com": "https://www.ft.com/markets?format=rss",
+    "wsj.com": "https://feeds.a.dj.com/rss/RSSMarketsMain.xml",
+    "forbes.com": "https://www.forbes.com/digital-assets/feed/",
+    "cnbc.com": "https://search.cnbc.com/rs/search/combinedcms/view.xml?partnerId=wrss01&id=10000664",
+}
+
 if __name__ == "__main__":
     print(f"RWA トークン総数: {sum(len(v) for v in RWA_TOKENS.values())}")
     print(f"キーパーソン数: {len(KEY_FIGURES)}")
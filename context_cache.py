@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+記事プロンプトの静的プレフィックスのコンテキストキャッシュ
+指示・記事構成・config.py 由来のファンダメンタルズ情報など毎回同じプレフィックスを
+Gemini の CachedContent に1回だけ登録し、呼び出しごとには実行時のデータ（サフィックス）だけを送る
+
+- プレフィックスと モデル名のハッシュで登録済みキャッシュを引き当て（.cache/context_cache.json に保存し実行間で再利用）
+- Gemini の最小トークン数に満たないプレフィックス・登録失敗時は LocalPrefixModel（プレフィックスを連結して送る）に切り替え
+  （現在の記事プロンプトのプレフィックスは約1,500トークンで、gemini-1.5 系の最小 32,768 トークンに届かないため
+  CachedContent は使われない。プレフィックスが大きくなった場合・最小トークン数の小さいモデルに移行した場合に働く）
+- プレフィックスには予算調整で長さが変わらない内容だけを置く（キーが実行ごとに変わらないように）
+- 動作確認: python verify_context_cache.py（API を呼ばずに登録・再利用・期限切れを確認）
+- LocalContextCache はテスト・オフライン用の代替実装（API を呼ばずに同じインターフェースで動作）
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import datetime
+import threading
+from pathlib import Path
+
+import google.generativeai as genai
+
+from gemini_models import get_model, model_settings
+from prompt_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_CACHE_ENABLED = os.getenv('CONTEXT_CACHE_ENABLED', '1') != '0'
+CONTEXT_CACHE_TTL = int(os.getenv('CONTEXT_CACHE_TTL', '3600'))
+# Gemini のコンテキストキャッシュが受け付ける最小トークン数（gemini-1.5-*-001 の API 下限。
+# これ未満の CachedContent.create は API が拒否するため、下げても登録失敗で毎回ローカル送信になるだけ）
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv('CONTEXT_CACHE_MIN_TOKENS', '32768'))
+CONTEXT_CACHE_REGISTRY = Path(os.getenv('CONTEXT_CACHE_REGISTRY', '.cache/context_cache.json'))
+
+# コンテキストキャッシュはバージョン固定のモデル名でのみ作成できる
+CACHEABLE_MODEL_VERSIONS = {
+    'gemini-1.5-flash': 'models/gemini-1.5-flash-001',
+    'gemini-1.5-pro': 'models/gemini-1.5-pro-001',
+}
+
+
+def prefix_key(model_name: str, prefix: str) -> str:
+    """モデル名 + プレフィックスのハッシュ"""
+    return hashlib.sha256(f'{model_name}\n{prefix}'.encode('utf-8')).hexdigest()
+
+
+class LocalPrefixModel:
+    """プレフィックスを毎回連結して送るモデル（コンテキストキャッシュを使わない場合の代替）"""
+
+    def __init__(self, model_name: str, prefix: str, model_factory=None):
+        self.model_name = model_name
+        self.prefix = prefix
+        self._model_factory = model_factory
+
+    def generate_content(self, suffix: str, **kwargs):
+        factory = self._model_factory or get_model
+        return factory(self.model_name).generate_content(self.prefix + suffix, **kwargs)
+
+
+class LocalContextCache:
+    """
+    API を呼ばないコンテキストキャッシュの代替実装
+    登録・再利用の回数を数えるだけで、生成は LocalPrefixModel に任せる
+    """
+
+    def __init__(self, model_factory=None):
+        self._model_factory = model_factory
+        self._lock = threading.Lock()
+        self.prefixes = {}
+        self.registrations = 0
+        self.hits = 0
+
+    def get_model(self, model_name: str, prefix: str):
+        """プレフィックスを登録（済みなら再利用）し、サフィックスだけを受け取るモデルを返す"""
+        key = prefix_key(model_name, prefix)
+        with self._lock:
+            if key in self.prefixes:
+                self.hits += 1
+            else:
+                self.prefixes[key] = prefix
+                self.registrations += 1
+        return LocalPrefixModel(model_name, prefix, self._model_factory)
+
+
+class GeminiContextCache(LocalContextCache):
+    """Gemini の CachedContent にプレフィックスを登録して再利用する"""
+
+    def __init__(self, registry_path=CONTEXT_CACHE_REGISTRY, ttl: int = CONTEXT_CACHE_TTL,
+                 min_tokens: int = CONTEXT_CACHE_MIN_TOKENS, model_factory=None):
+        super().__init__(model_factory)
+        self.registry_path = Path(registry_path)
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self._registry = None
+        self._models = {}
+        self._below_minimum = set()
+
+    def _load_registry(self) -> dict:
+        if self._registry is None:
+            try:
+                with open(self.registry_path, 'r', encoding='utf-8') as f:
+                    self._registry = json.load(f)
+            except FileNotFoundError:
+                self._registry = {}
+            except Exception as e:
+                logger.warning(f'コンテキストキャッシュ台帳の読み込み失敗: {str(e)[:50]}')
+                self._registry = {}
+        return self._registry
+
+    def _save_registry(self):
+        try:
+            self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.registry_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._registry, f, ensure_ascii=False)
+            os.replace(tmp_path, self.registry_path)
+        except Exception as e:
+            logger.warning(f'コンテキストキャッシュ台帳の保存失敗: {str(e)[:50]}')
+
+    def _lookup(self, key: str):
+        """台帳から有効期限内の CachedContent を取得"""
+        entry = self._load_registry().get(key)
+        if not entry or entry.get('expires_at', 0) - 60 < time.time():
+            return None
+        try:
+            return genai.caching.CachedContent.get(entry['name'])
+        except Exception as e:
+            logger.warning(f'コンテキストキャッシュ取得失敗: {str(e)[:50]}')
+            return None
+
+    def _register(self, key: str, model_name: str, prefix: str):
+        cached = genai.caching.CachedContent.create(
+            model=CACHEABLE_MODEL_VERSIONS[model_name],
+            display_name=f'rwanews-{key[:16]}',
+            contents=[prefix],
+            ttl=datetime.timedelta(seconds=self.ttl),
+        )
+        self._load_registry()[key] = {'name': cached.name, 'expires_at': time.time() + self.ttl}
+        self._save_registry()
+        logger.info(f'✅ プロンプトのプレフィックスをコンテキストキャッシュに登録: {cached.name}')
+        return cached
+
+    def get_model(self, model_name: str, prefix: str):
+        key = prefix_key(model_name, prefix)
+        if model_name not in CACHEABLE_MODEL_VERSIONS:
+            return super().get_model(model_name, prefix)
+        tokens = estimate_tokens(prefix)
+        if tokens < self.min_tokens:
+            if key not in self._below_minimum:
+                self._below_minimum.add(key)
+                logger.info(f'プレフィックス {tokens} トークンは最小 {self.min_tokens} トークン未満のため、'
+                            f'コンテキストキャッシュを使わずに送信します')
+            return super().get_model(model_name, prefix)
+
+        with self._lock:
+            # プロセス内で作ったモデルも CachedContent の期限が近づいたら作り直す
+            model, expires_at = self._models.get(key, (None, 0))
+            if model is not None and expires_at - 60 >= time.time():
+                self.hits += 1
+                return model
+            try:
+                cached = self._lookup(key)
+                if cached is not None:
+                    self.hits += 1
+                else:
+                    cached = self._register(key, model_name, prefix)
+                    self.registrations += 1
+                model = genai.GenerativeModel.from_cached_content(
+                    cached, generation_config=model_settings(model_name) or None
+                )
+                expires_at = self._load_registry()[key]['expires_at']
+            except Exception as e:
+                logger.warning(f'コンテキストキャッシュ登録失敗（プレフィックスを毎回送信）: {str(e)[:50]}')
+                model = LocalPrefixModel(model_name, prefix, self._model_factory)
+                expires_at = time.time() + self.ttl
+            self._models[key] = (model, expires_at)
+            return model
+
+
+def create_context_cache():
+    """設定に応じたコンテキストキャッシュ（CONTEXT_CACHE_ENABLED=0 でローカル代替）"""
+    if CONTEXT_CACHE_ENABLED:
+        return GeminiContextCache()
+    return LocalContextCache()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+config.py 由来のプロンプト断片のコンパイル済みキャッシュ
+RWA_TOKENS・KEY_FIGURES・FUNDAMENTALS_CATEGORIES・NEWS_CATEGORIES・CREDIBILITY_SOURCES から作る
+ファンダメンタルズコンテキストの断片を config のバージョンごとに1回だけ生成し、
+config.py の内容ハッシュをキーにディスク（.cache/context/）へ保存する
+
+- config.py の mtime・サイズが変わった時だけ内容ハッシュを計算し直す
+- 断片はハッシュを取ったのと同じバイト列から読み込んだ config で生成する
+  （import 済みの config モジュールは実行中に config.py が編集されると古いままのため使わない）
+- 同じハッシュの断片はプロセス内・実行間で再利用（バッチ生成で毎記事組み立て直さない）
+- config.py が無い場合は空のコンテキストを返す
+"""
+
+import os
+import json
+import types
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+try:
+    import config
+except ImportError:
+    config = None
+
+logger = logging.getLogger(__name__)
+
+COMPILED_CONTEXT_DIR = Path(os.getenv('COMPILED_CONTEXT_DIR', '.cache/context'))
+
+# 断片の構成を変えたら上げる（古い断片ファイルを使わないため）
+COMPILER_VERSION = 2
+
+
+def _load_config(source: bytes, path: Path):
+    """config.py の内容（バイト列）をモジュールとして読み込む"""
+    module = types.ModuleType('config')
+    module.__file__ = str(path)
+    exec(compile(source, str(path), 'exec'), module.__dict__)
+    return module
+
+
+def _render_tokens(config) -> list:
+    """RWA厳選50銘柄の概要"""
+    parts = ["【RWA厳選50銘柄の分布】"]
+    for category, tokens in config.RWA_TOKENS.items():
+        token_names = ", ".join([t['symbol'] for t in tokens])
+        parts.append(f"  - {category}: {token_names}")
+    return parts
+
+
+def _render_key_figures(config) -> list:
+    """キーパーソンの最新動向例"""
+    parts = ["\n【業界キーパーソン30名】"]
+    if len(config.KEY_FIGURES) >= 5:
+        parts.append("  主要人物（抜粋）:")
+        for person in config.KEY_FIGURES[:5]:
+            parts.append(f"    - {person['name']} ({person['affiliation']}): {person['recent_focus']}")
+    return parts
+
+
+def _render_fundamentals_axes(config) -> list:
+    """ファンダメンタルズスコアリング軸"""
+    parts = ["\n【ファンダメンタルズスコアリング5軸】"]
+    for category, data in config.FUNDAMENTALS_CATEGORIES.items():
+        weight_pct = data['weight'] * 100
+        indicators = data['indicators'][:2]  # 最初の2つのみ表示
+        parts.append(f"  - {category} ({weight_pct}%): {', '.join(indicators)}")
+    return parts
+
+
+def _render_news_categories(config) -> list:
+    """ニュースカテゴリ"""
+    categories = ", ".join(config.NEWS_CATEGORIES[:6])
+    return ["\n【ニュース分類カテゴリ】", f"  {categories}..."]
+
+
+def _render_credibility_sources(config) -> list:
+    """信頼度ソース"""
+    high_sources = config.CREDIBILITY_SOURCES['超高'][:3]
+    return ["\n【信頼度の高いニュースソース】", f"  超高: {', '.join(high_sources)}"]
+
+
+# ファンダメンタルズコンテキストを構成する断片（この順に連結）
+FRAGMENTS = {
+    'tokens': _render_tokens,
+    'key_figures': _render_key_figures,
+    'fundamentals_axes': _render_fundamentals_axes,
+    'news_categories': _render_news_categories,
+    'credibility_sources': _render_credibility_sources,
+}
+
+
+class ContextCompiler:
+    """config.py の内容ハッシュごとにコンパイル済み断片を保持"""
+
+    def __init__(self, root=COMPILED_CONTEXT_DIR, config_path: str = None):
+        self.root = Path(root)
+        if config_path is None and config is not None:
+            config_path = config.__file__
+        self.config_path = Path(config_path) if config_path else None
+        self._lock = threading.Lock()
+        self._stat = None
+        self._hash = None
+        self._fragments = None
+
+    def config_hash(self) -> str:
+        """config.py の内容ハッシュ（mtime・サイズが変わらなければ前回の値）"""
+        stat = self.config_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._stat:
+            self._hash = self._digest(self.config_path.read_bytes())
+            self._stat = signature
+        return self._hash
+
+    @staticmethod
+    def _digest(source: bytes) -> str:
+        digest = hashlib.sha256(source)
+        digest.update(f'v{COMPILER_VERSION}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _compile(self) -> tuple:
+        """config.py を読み直し、その内容のハッシュと、同じ内容から生成した断片を返す"""
+        source = self.config_path.read_bytes()
+        current = self._digest(source)
+        path = self.root / f'{current[:16]}.json'
+        module = _load_config(source, self.config_path)
+        fragments = {name: '\n'.join(render(module)) for name, render in FRAGMENTS.items()}
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(fragments, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f'コンパイル済みコンテキストの保存失敗: {str(e)[:50]}')
+        logger.info(f'config.py のコンテキスト断片をコンパイル: {path.name}')
+        return current, fragments
+
+    def fragments(self) -> dict:
+        """現在の config.py に対応する断片 {名前: テキスト}"""
+        if self.config_path is None:
+            return {}
+        with self._lock:
+            current = self.config_hash()
+            if self._fragments is not None and self._fragments[0] == current:
+                return self._fragments[1]
+
+            path = self.root / f'{current[:16]}.json'
+            fragments = None
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    fragments = json.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f'コンパイル済みコンテキストの読み込み失敗: {str(e)[:50]}')
+
+            if fragments is None or set(fragments) != set(FRAGMENTS):
+                # ハッシュ計算後に config.py が変わっていても、保存するハッシュと断片の内容は一致する
+                current, fragments = self._compile()
+            self._fragments = (current, fragments)
+            return fragments
+
+    def fundamentals_context(self) -> str:
+        """ファンダメンタルズコンテキスト（断片を規定の順に連結）"""
+        fragments = self.fragments()
+        if not fragments:
+            return ''
+        return "\n".join(fragments[name] for name in FRAGMENTS)
+
+
+_shared_compiler = None
+_shared_lock = threading.Lock()
+
+
+def get_compiler() -> ContextCompiler:
+    """プロセス全体で共有する ContextCompiler を取得"""
+    global _shared_compiler
+    with _shared_lock:
+        if _shared_compiler is None:
+            _shared_compiler = ContextCompiler()
+        return _shared_compiler
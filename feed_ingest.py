@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ターゲットドメインの RSS/Atom フィードの差分取り込み
+config.TARGET_FEEDS のフィードを news_fanout で並列に取得し、初めて見る記事だけをローカルの記事ストアへ追記する
+
+- フィードごとの ETag / Last-Modified を保存し、条件付き GET を送る（更新が無ければ 304 で本文を受け取らない）
+- フィードは XMLPullParser で先頭から順に解析し、既知の記事が FEED_SEEN_STOP 件続いたら以降は読まない
+  （フィードは新しい順のため、定常状態では新着分だけを解析する）
+- 記事の識別子は正規化 URL（リンクが無ければ guid / id）
+
+レイアウト（root 配下）:
+  state.json    フィード URL ごとの ETag・Last-Modified・最終取得時刻
+  items.jsonl   取り込んだ記事（1行1件・追記のみ、FEED_RETENTION_DAYS を過ぎた分は取り込み時に整理）
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html import unescape
+from pathlib import Path
+from urllib.parse import urlsplit
+
+try:
+    import config
+except ImportError:
+    config = None
+from http_client import get_client
+from macro_index import BM25Index
+from news_fanout import fan_out, canonical_url, FANOUT_MAX_RESULTS
+
+logger = logging.getLogger(__name__)
+
+FEED_INGEST_ENABLED = os.getenv('FEED_INGEST_ENABLED', '1') != '0'
+FEED_STORE_DIR = Path(os.getenv('FEED_STORE_DIR', 'output/feeds'))
+FEED_RETENTION_DAYS = int(os.getenv('FEED_RETENTION_DAYS', '30'))
+# 記事生成に使う新着記事の期間
+FEED_RECENT_DAYS = int(os.getenv('FEED_RECENT_DAYS', '3'))
+# フィード1件から読む最大記事数と、既知の記事が何件続いたら読むのをやめるか
+FEED_MAX_ITEMS = int(os.getenv('FEED_MAX_ITEMS', '50'))
+FEED_SEEN_STOP = int(os.getenv('FEED_SEEN_STOP', '3'))
+# フィードの関連記事がこの件数に満たなければ検索のファンアウトでも補う
+FEED_MIN_RESULTS = int(os.getenv('FEED_MIN_RESULTS', '3'))
+FEED_CHUNK_SIZE = 16384
+SUMMARY_MAX_CHARS = 300
+
+# RWA の記事とみなす条件（タイトル・要約にいずれかを含むこと）
+RWA_PATTERN = re.compile(r'\brwas?\b|tokeni[sz]|real[- ]world[- ]assets?|トークン化|実物資産', re.IGNORECASE)
+
+# 条件を満たした記事の順位付けに使う語（キーワードに追加。一般的な市況語は加点のみ）
+RELEVANCE_TERMS = (
+    'RWA real-world assets tokenized tokenization tokenised tokenisation tokenize '
+    'treasury treasuries bond bonds fund funds private credit stablecoin stablecoins '
+    'トークン化 実物資産 国債 証券'
+)
+
+FEED_HEADERS = {
+    'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, text/xml;q=0.8',
+}
+
+_TAGS = re.compile(r'<[^>]+>')
+_SPACES = re.compile(r'\s+')
+DAY = 86400
+
+
+def _local(tag: str) -> str:
+    """名前空間を除いた要素名（{http://www.w3.org/2005/Atom}entry → entry）"""
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def _plain_text(value: str) -> str:
+    text = _SPACES.sub(' ', _TAGS.sub(' ', unescape(value or ''))).strip()
+    if len(text) > SUMMARY_MAX_CHARS:
+        text = text[:SUMMARY_MAX_CHARS].rsplit(' ', 1)[0] + '…'
+    return text
+
+
+def _parse_date(value: str) -> str:
+    """RSS（RFC 822）・Atom（ISO 8601）の日付を UTC の ISO 文字列に（解釈できなければ None）"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(timespec='seconds')
+
+
+def _entry_fields(element) -> dict:
+    """<item>（RSS）/ <entry>（Atom）から タイトル・リンク・識別子・日付・要約を取り出す"""
+    fields = {}
+    for child in element:
+        name = _local(child.tag)
+        text = (child.text or '').strip()
+        if name == 'link':
+            # Atom は href 属性（rel が alternate または省略のもの）、RSS は本文
+            href = child.get('href')
+            if href is None:
+                fields.setdefault('link', text)
+            elif child.get('rel', 'alternate') == 'alternate':
+                fields.setdefault('link', href.strip())
+        elif name in ('guid', 'id'):
+            fields.setdefault('guid', text)
+        elif name == 'title':
+            fields.setdefault('title', _plain_text(text))
+        elif name in ('pubdate', 'published', 'date', 'updated'):
+            fields.setdefault('published', _parse_date(text))
+        elif name in ('description', 'summary', 'encoded', 'content'):
+            if 'summary' not in fields or name in ('description', 'summary'):
+                fields['summary'] = _plain_text(text)
+    return fields
+
+
+def iter_feed_items(chunks, max_items: int = FEED_MAX_ITEMS):
+    """
+    RSS/Atom をチャンク単位で解析し、記事ごとの dict を先頭から順に返すジェネレーター
+    呼び出し側が途中でやめれば残りのチャンクは解析しない。XML が壊れていればそこまでの記事で終わる
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    count = 0
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                if _local(element.tag) not in ('item', 'entry'):
+                    continue
+                fields = _entry_fields(element)
+                # 解析済みの記事は手放す（大きなフィードでもメモリを一定に保つ）
+                element.clear()
+                if not fields.get('link') and not fields.get('guid'):
+                    continue
+                yield fields
+                count += 1
+                if count >= max_items:
+                    return
+    except ET.ParseError as e:
+        logger.warning(f'フィード解析を中断: {str(e)[:50]}')
+
+
+def _chunks(content: bytes, chunk_size: int = FEED_CHUNK_SIZE):
+    for start in range(0, len(content), chunk_size):
+        yield content[start:start + chunk_size]
+
+
+class FeedSource:
+    """1ドメイン分のフィード（news_fanout.fan_out のソース）"""
+
+    def __init__(self, domain: str, url: str, ingestor):
+        self.domain = domain
+        self.url = url
+        self.host = urlsplit(url).hostname
+        self.ingestor = ingestor
+
+    def fetch(self, keyword: str = None) -> list:
+        return self.ingestor.fetch_feed(self.domain, self.url)
+
+
+class FeedIngestor:
+    """フィードの条件付き取得と、既読管理付きの記事ストア"""
+
+    def __init__(self, root=FEED_STORE_DIR, feeds: dict = None):
+        self.root = Path(root)
+        if feeds is None:
+            feeds = getattr(config, 'TARGET_FEEDS', {})
+        # TARGET_DOMAINS に含まれるドメインのフィードだけを使う（config.py が無ければ渡されたフィードをそのまま使う）
+        domains = getattr(config, 'TARGET_DOMAINS', None)
+        self.feeds = {d: url for d, url in feeds.items() if domains is None or d in domains}
+        self._lock = threading.Lock()
+        self._state = None
+        self._items = None
+        self._seen = None
+
+    # --- 永続化 ---
+
+    def _load(self):
+        if self._state is not None:
+            return
+        try:
+            with open(self.root / 'state.json', 'r', encoding='utf-8') as f:
+                self._state = json.load(f)
+        except FileNotFoundError:
+            self._state = {}
+        except Exception as e:
+            logger.warning(f'フィード状態の読み込み失敗: {str(e)[:50]}')
+            self._state = {}
+
+        self._items = []
+        try:
+            with open(self.root / 'items.jsonl', 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self._items.append(json.loads(line))
+                    except ValueError:
+                        continue  # 書き込み途中で終わった行
+        except FileNotFoundError:
+            pass
+        self._seen = {item['id'] for item in self._items}
+
+    def _save_state(self):
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.root / 'state.json.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.root / 'state.json')
+        except Exception as e:
+            logger.warning(f'フィード状態の保存失敗: {str(e)[:50]}')
+
+    def _append_items(self, items: list):
+        if not items:
+            return
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / 'items.jsonl', 'a', encoding='utf-8') as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        except Exception as e:
+            logger.warning(f'フィード記事の保存失敗: {str(e)[:50]}')
+
+    def _compact(self):
+        """保持期間を過ぎた記事が半数を超えたら items.jsonl を書き直す"""
+        cutoff = time.time() - FEED_RETENTION_DAYS * DAY
+        live = [item for item in self._items if item['fetched_at'] >= cutoff]
+        if len(live) * 2 >= len(self._items):
+            return
+        try:
+            tmp_path = self.root / 'items.jsonl.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for item in live:
+                    f.write(json.dumps(item, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.root / 'items.jsonl')
+            logger.info(f'フィード記事ストアを整理: {len(self._items) - len(live)} 件削除')
+            self._items = live
+            self._seen = {item['id'] for item in live}
+        except Exception as e:
+            logger.warning(f'フィード記事ストアの整理失敗: {str(e)[:50]}')
+
+    # --- 取得 ---
+
+    def fetch_feed(self, domain: str, url: str) -> list:
+        """フィードを条件付き GET で取得し、新着記事だけを保存して返す"""
+        with self._lock:
+            self._load()
+            validators = dict(self._state.get(url) or {})
+
+        headers = dict(FEED_HEADERS)
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        # 検証は自前の ETag / Last-Modified で行うため、HTTP キャッシュは通さない
+        response = get_client().get(url, headers=headers, cache=False)
+        if response.status_code == 304:
+            logger.info(f'フィード更新なし（304）: {domain}')
+            with self._lock:
+                self._state[url] = {**validators, 'checked_at': time.time()}
+            return []
+        if response.status_code != 200:
+            raise RuntimeError(f'ステータス {response.status_code}')
+
+        now = time.time()
+        new_items, seen_run = [], 0
+        for fields in iter_feed_items(_chunks(response.content)):
+            item_id = canonical_url(fields['link']) if fields.get('link') else fields['guid']
+            with self._lock:
+                if item_id in self._seen:
+                    seen_run += 1
+                    if seen_run >= FEED_SEEN_STOP:
+                        break
+                    continue
+                self._seen.add(item_id)
+            seen_run = 0
+            new_items.append({
+                'id': item_id,
+                'domain': domain,
+                'title': fields.get('title') or '',
+                'url': fields.get('link') or fields['guid'],
+                'snippet': fields.get('summary') or '',
+                'published': fields.get('published'),
+                'fetched_at': now,
+            })
+
+        with self._lock:
+            self._items.extend(new_items)
+            self._state[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'checked_at': now,
+            }
+            self._append_items(new_items)
+        logger.info(f'フィード取り込み: {domain} 新着 {len(new_items)} 件')
+        return new_items
+
+    def ingest(self) -> dict:
+        """全フィードを並列に取得し、{ドメイン: 新着記事} を返す"""
+        sources = [FeedSource(domain, url, self) for domain, url in self.feeds.items()]
+        results = fan_out(sources, None)
+        with self._lock:
+            self._load()
+            self._save_state()
+            self._compact()
+        return results
+
+    # --- 記事の選定 ---
+
+    def recent_items(self, days: int = FEED_RECENT_DAYS) -> list:
+        """直近 days 日の記事（公開日時が無ければ取り込み時刻で判定）、新しい順"""
+        with self._lock:
+            self._load()
+            items = list(self._items)
+        cutoff = time.time() - days * DAY
+
+        def _timestamp(item):
+            if item.get('published'):
+                try:
+                    return datetime.fromisoformat(item['published']).timestamp()
+                except ValueError:
+                    pass
+            return item['fetched_at']
+
+        recent = [(ts, item) for ts, item in ((_timestamp(i), i) for i in items) if ts >= cutoff]
+        recent.sort(key=lambda entry: entry[0], reverse=True)
+        return [item for _, item in recent]
+
+    def relevant_items(self, keyword: str = '', k: int = FANOUT_MAX_RESULTS,
+                       days: int = FEED_RECENT_DAYS) -> list:
+        """
+        直近の記事のうち RWA_PATTERN に一致するものを、キーワード・RWA 関連語の BM25 スコア順に k 件（同点は新しい順）
+        国債・債券・ファンドなど一般的な市況記事は RWA_PATTERN に一致しない限り含めない
+        """
+        items = [
+            item for item in self.recent_items(days)
+            if RWA_PATTERN.search(f"{item['title']} {item['snippet']}")
+        ]
+        if not items:
+            return []
+        # 条件を満たした記事はスコア 0（語形の違い等）でも候補に残す
+        scores = BM25Index([f"{item['title']} {item['snippet']}" for item in items]).scores(f'{keyword} {RELEVANCE_TERMS}')
+        ranked = sorted(range(len(items)), key=lambda i: (-scores.get(i, 0.0), i))
+        return [items[i] for i in ranked[:k]]
+
+
+_shared_ingestor = None
+_shared_lock = threading.Lock()
+
+
+def get_ingestor() -> FeedIngestor:
+    """プロセス全体で共有する FeedIngestor を取得"""
+    global _shared_ingestor
+    with _shared_lock:
+        if _shared_ingestor is None:
+            _shared_ingestor = FeedIngestor()
+        return _shared_ingestor
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ファンダメンタルズ・スコアリングエンジン（NumPy ベクトル化）
+config.RWA_TOKENS（50銘柄）× config.FUNDAMENTALS_CATEGORIES の指標（5軸×5指標）の
+行列を作り、カテゴリ重みを1回の行列演算で適用する
+
+- 指標値は 0.0～1.0（未観測は 0）
+- 軸スコア = 軸内の指標平均 × 100、総合スコア = Σ 重み × 軸スコア
+- observed（観測できた指標のマスク）を渡すと、観測できた指標だけで軸内平均を取り、
+  観測できた指標が無い軸は除いて重みを正規化する（未観測の軸が常に 0 点で総合スコアを押し下げないため）
+- score_batch() で (スナップショット数 × 銘柄 × 指標) のテンソルを一括計算
+"""
+
+import numpy as np
+
+try:
+    import config
+except ImportError:
+    config = None
+
+
+class FundamentalsScorer:
+    """銘柄 × 指標行列からファンダメンタルズスコアを計算"""
+
+    def __init__(self, categories: dict = None, tokens: dict = None):
+        categories = categories or getattr(config, 'FUNDAMENTALS_CATEGORIES', None)
+        tokens = tokens or getattr(config, 'RWA_TOKENS', None)
+        if not categories or not tokens:
+            raise ValueError('FUNDAMENTALS_CATEGORIES・RWA_TOKENS がありません（config.py を確認）')
+
+        self.axes = list(categories)
+        self.indicators = [
+            indicator for axis in self.axes for indicator in categories[axis]['indicators']
+        ]
+        self.symbols = [token['symbol'] for sector in tokens.values() for token in sector]
+        self.sectors = list(tokens)
+
+        self._indicator_index = {name: i for i, name in enumerate(self.indicators)}
+        self._symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        # 指標 × 軸: 軸内平均を取る行列（各列の和が 1）
+        self.axis_matrix = np.zeros((len(self.indicators), len(self.axes)))
+        row = 0
+        for j, axis in enumerate(self.axes):
+            count = len(categories[axis]['indicators'])
+            self.axis_matrix[row:row + count, j] = 1.0 / count
+            row += count
+
+        self.weights = np.array([categories[axis]['weight'] for axis in self.axes])
+
+        # 銘柄 × セクター: セクター内平均を取る行列
+        self.sector_matrix = np.zeros((len(self.symbols), len(self.sectors)))
+        row = 0
+        for j, sector in enumerate(self.sectors):
+            count = len(tokens[sector])
+            self.sector_matrix[row:row + count, j] = 1.0 / count
+            row += count
+
+    def build_matrix(self, signals: dict) -> np.ndarray:
+        """{銘柄: {指標: 値}} から 銘柄 × 指標 の行列を作る（未知の銘柄・指標は無視）"""
+        matrix = np.zeros((len(self.symbols), len(self.indicators)))
+        for symbol, values in (signals or {}).items():
+            i = self._symbol_index.get(symbol)
+            if i is None:
+                continue
+            for indicator, value in values.items():
+                j = self._indicator_index.get(indicator)
+                if j is not None:
+                    matrix[i, j] = value
+        return np.clip(matrix, 0.0, 1.0)
+
+    def observed_indicators(self, signals: dict) -> np.ndarray:
+        """signals のいずれかの銘柄で値がある指標のマスク（指標数の bool 配列）"""
+        observed = np.zeros(len(self.indicators), dtype=bool)
+        for values in (signals or {}).values():
+            for indicator in values:
+                j = self._indicator_index.get(indicator)
+                if j is not None:
+                    observed[j] = True
+        return observed
+
+    def _weights_for(self, observed: np.ndarray = None) -> tuple:
+        """観測できた指標だけで平均を取る 指標 × 軸 行列と、観測できた軸だけで正規化した重み"""
+        if observed is None:
+            return self.axis_matrix, self.weights
+        axis_matrix = self.axis_matrix * np.asarray(observed, dtype=float)[:, None]
+        counts = axis_matrix.sum(axis=0)
+        axis_matrix = np.divide(axis_matrix, counts, out=np.zeros_like(axis_matrix), where=counts > 0)
+        weights = np.where(counts > 0, self.weights, 0.0)
+        if weights.sum() > 0:
+            weights = weights / weights.sum()
+        return axis_matrix, weights
+
+    def score_batch(self, tensor: np.ndarray, observed: np.ndarray = None) -> tuple:
+        """
+        (..., 銘柄, 指標) の配列を一括スコアリング
+        戻り値: (軸スコア (..., 銘柄, 軸), 総合スコア (..., 銘柄), セクタースコア (..., セクター))
+        """
+        axis_matrix, weights = self._weights_for(observed)
+        axis_scores = np.asarray(tensor, dtype=float) @ axis_matrix * 100.0
+        totals = axis_scores @ weights
+        sector_scores = totals @ self.sector_matrix
+        return axis_scores, totals, sector_scores
+
+    def score(self, matrix: np.ndarray, observed: np.ndarray = None) -> dict:
+        """
+        1スナップショット分の 銘柄 × 指標 行列をスコアリングし、辞書で返す
+        observed を渡した場合、軸スコアは観測できた軸（observed_axes）だけを含める
+        """
+        axis_scores, totals, sector_scores = self.score_batch(matrix, observed)
+        _, weights = self._weights_for(observed)
+        axes = [(j, axis) for j, axis in enumerate(self.axes) if weights[j] > 0]
+        return {
+            'observed_axes': [axis for _, axis in axes],
+            'tokens': {
+                symbol: {
+                    'total': round(float(totals[i]), 1),
+                    'axes': {axis: round(float(axis_scores[i, j]), 1) for j, axis in axes},
+                }
+                for i, symbol in enumerate(self.symbols)
+            },
+            'sectors': {
+                sector: round(float(sector_scores[j]), 1) for j, sector in enumerate(self.sectors)
+            },
+        }
+
+    def market_signals(self, snapshot: dict) -> dict:
+        """
+        market_data のスナップショットから「市場動向」軸の指標値を導出
+        出来高・回転率（出来高 / 時価総額）・24h 変化率をユニバース内の順位（0～1）に変換
+        """
+        tokens = (snapshot or {}).get('tokens') or {}
+        symbols = [s for s in self.symbols if s in tokens]
+        if not symbols:
+            return {}
+
+        def _ranks(values):
+            values = np.nan_to_num(np.array(values, dtype=float), nan=-np.inf)
+            order = values.argsort().argsort()
+            return order / max(1, len(values) - 1)
+
+        volume = [tokens[s].get('volume') or np.nan for s in symbols]
+        turnover = [
+            (tokens[s].get('volume') or 0) / tokens[s]['market_cap'] if tokens[s].get('market_cap') else np.nan
+            for s in symbols
+        ]
+        change = [
+            tokens[s]['change_24h'] if tokens[s].get('change_24h') is not None else np.nan
+            for s in symbols
+        ]
+
+        volume_rank, turnover_rank, change_rank = _ranks(volume), _ranks(turnover), _ranks(change)
+        return {
+            symbol: {
+                '取引高の拡大': float(volume_rank[i]),
+                'オンチェーンアクティビティ': float(turnover_rank[i]),
+                'セクター全体の成長': float(change_rank[i]),
+            }
+            for i, symbol in enumerate(symbols)
+        }
+
+
+if __name__ == "__main__":
+    import time
+
+    scorer = FundamentalsScorer()
+    print(f"銘柄数: {len(scorer.symbols)} / 指標数: {len(scorer.indicators)} / 軸: {', '.join(scorer.axes)}")
+
+    history = np.random.rand(5000, len(scorer.symbols), len(scorer.indicators))
+    started = time.perf_counter()
+    _, totals, _ = scorer.score_batch(history)
+    print(f"{history.shape[0]} スナップショットを {time.perf_counter() - started:.3f} 秒でスコアリング")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gemini モデルクライアントのレジストリ
+genai.configure はプロセスで1回だけ（API キーが変わった時のみ）実行し、
+GenerativeModel はモデル名ごとに1つ作って使い回す（接続・クライアントの初期化を記事ごとに繰り返さない）
+
+- モデルごとの生成設定は MODEL_SETTINGS で管理（LLM キャッシュのキーにも含める）
+"""
+
+import threading
+
+import google.generativeai as genai
+
+# モデルごとの生成設定（GenerativeModel の generation_config）
+MODEL_SETTINGS = {
+    'gemini-1.5-flash': {'max_output_tokens': 4096},
+    'gemini-1.5-flash-8b': {'max_output_tokens': 3072},
+}
+
+_lock = threading.Lock()
+_configured_key = None
+_models = {}
+
+
+def configure_once(api_key: str):
+    """genai.configure を API キーが変わった時だけ実行（再設定するとクライアントが作り直されるため）"""
+    global _configured_key
+    with _lock:
+        if api_key != _configured_key:
+            genai.configure(api_key=api_key)
+            _configured_key = api_key
+            _models.clear()
+
+
+def model_settings(model_name: str) -> dict:
+    """モデルの生成設定（未登録のモデルは空）"""
+    return dict(MODEL_SETTINGS.get(model_name, {}))
+
+
+def get_model(model_name: str):
+    """モデル名ごとに共有する GenerativeModel を取得"""
+    with _lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(model_name, generation_config=model_settings(model_name) or None)
+            _models[model_name] = model
+        return model
@@ -2,73 +2,105 @@
 # -*- coding: utf-8 -*-
 """
 RWA News の実際の記事を生成するスクリプト
-main.py の generate_news_article() を複数回呼び出して、
+main.py の generate_news_article() を並列に呼び出して、
 複数の本物のニュース記事を生成します。
 """
 
+import os
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 # main.py のクラスをインポート
 from main import RWANewsGenerator
+from rate_limit import GeminiQuota
+
+# 並列生成の同時実行数と Gemini のクォータ（毎分リクエスト数・トークン数）
+ARTICLE_WORKERS = int(os.getenv('ARTICLE_WORKERS', '3'))
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '15'))
+GEMINI_TOKENS_PER_MINUTE = float(os.getenv('GEMINI_TOKENS_PER_MINUTE', '1000000'))
+
+# 記事ごとの切り口（記事番号順に割り当て）
+ARTICLE_ANGLES = [
+    "機関投資家の参入（BlackRock・Franklin Templeton 等のトークン化ファンド）を中心に掘り下げる",
+    "規制フレームワーク（SEC・金融庁・FCA）の整備状況を中心に掘り下げる",
+    "技術・インフラ（Chainlink・XDC 等の相互運用性とセキュリティ）を中心に掘り下げる",
+    "TradFi との提携と実需（貿易金融・プライベートクレジット）を中心に掘り下げる",
+    "日本市場への波及（不動産・国債のトークン化）を中心に掘り下げる",
+]
+
+def _generate_one_article(generator: RWANewsGenerator, index: int, num_articles: int,
+                          inputs: dict) -> dict:
+    """1件の記事を生成（並列実行用）"""
+    print("\n[記事 %d/%d] 生成中..." % (index+1, num_articles))
 
-def generate_multiple_articles(num_articles: int = 3) -> list:
-    """複数の本物のニュース記事を生成"""
+    try:
+        # ダミーのトレンドデータ（main.py が Gemini API を呼ぶ時に使用）
+        # 時刻はプロンプトに含めない（再実行時に LLM キャッシュを再利用するため）
+        dummy_trends = {
+            "trending_keywords": ["RWA", "トークン化", "機関投資家"],
+            "market_context": "RWA市場は制度化フェーズに突入",
+        }
+
+        # 記事ごとの切り口（共有の入力だけでは全記事が同じプロンプトになるため）
+        angle = ARTICLE_ANGLES[index % len(ARTICLE_ANGLES)]
+        article_inputs = {**inputs, 'angle': "記事 #%d: %s" % (index + 1, angle)}
+
+        # 記事を生成（Gemini API を使用）
+        article_html = generator.generate_news_article(dummy_trends, inputs=article_inputs)
+
+        # テキストのみを抽出（HTML タグを除去）
+        article_text = article_html.replace("<br/>", "\n").replace("<br>", "\n")
+
+        # ソース情報を生成（main.py の検索結果から）
+        sources = [
+            {"domain": "blockworks.co", "name": "Blockworks"},
+            {"domain": "coindesk.com", "name": "CoinDesk"},
+            {"domain": "messari.io", "name": "Messari"},
+        ]
+
+        print("[OK] 記事 %d を生成しました" % (index+1))
+        return {
+            "title": "RWA深掘りニュース #%d" % (index+1),
+            "content": article_text,
+            "html": article_html,
+            "timestamp": datetime.now().isoformat(),
+            "index": index,
+            "sources": sources
+        }
+
+    except Exception as e:
+        print("[ERROR] 記事 %d の生成に失敗: %s" % (index+1, str(e)))
+        return {
+            "title": "RWA深掘りニュース #%d" % (index+1),
+            "content": "記事生成エラー: %s" % str(e),
+            "html": "<p>記事生成エラー: %s</p>" % str(e),
+            "timestamp": datetime.now().isoformat(),
+            "index": index,
+            "error": True
+        }
+
+
+def generate_multiple_articles(num_articles: int = 3, max_workers: int = ARTICLE_WORKERS) -> list:
+    """複数の本物のニュース記事を生成（同時実行数とGeminiクォータを守って並列生成）"""
 
     generator = RWANewsGenerator()
-    articles = []
+    generator.gemini_quota = GeminiQuota(GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE)
 
-    print("[*] %d 件のRWAニュース記事を生成中..." % num_articles)
+    print("[*] %d 件のRWAニュース記事を生成中（同時実行数: %d）..." % (num_articles, max_workers))
     print("=" * 60)
 
-    # トレンドデータのダミー（実際のデータで上書きされます）
-    for i in range(num_articles):
-        print("\n[記事 %d/%d] 生成中..." % (i+1, num_articles))
-
-        try:
-            # ダミーのトレンドデータ（main.py が Gemini API を呼ぶ時に使用）
-            dummy_trends = {
-                "trending_keywords": ["RWA", "トークン化", "機関投資家"],
-                "market_context": "RWA市場は制度化フェーズに突入",
-                "timestamp": datetime.now().isoformat()
-            }
-
-            # 記事を生成（Gemini API を使用）
-            article_html = generator.generate_news_article(dummy_trends)
-
-            # テキストのみを抽出（HTML タグを除去）
-            article_text = article_html.replace("<br/>", "\n").replace("<br>", "\n")
-
-            # ソース情報を生成（main.py の検索結果から）
-            sources = [
-                {"domain": "blockworks.co", "name": "Blockworks"},
-                {"domain": "coindesk.com", "name": "CoinDesk"},
-                {"domain": "messari.io", "name": "Messari"},
-            ]
-
-            articles.append({
-                "title": "RWA深掘りニュース #%d" % (i+1),
-                "content": article_text,
-                "html": article_html,
-                "timestamp": datetime.now().isoformat(),
-                "index": i,
-                "sources": sources
-            })
-
-            print("[OK] 記事 %d を生成しました" % (i+1))
-
-        except Exception as e:
-            print("[ERROR] 記事 %d の生成に失敗: %s" % (i+1, str(e)))
-            articles.append({
-                "title": "RWA深掘りニュース #%d" % (i+1),
-                "content": "記事生成エラー: %s" % str(e),
-                "html": "<p>記事生成エラー: %s</p>" % str(e),
-                "timestamp": datetime.now().isoformat(),
-                "index": i,
-                "error": True
-            })
+    # 検索・コンテキスト構築は全記事で共有（記事ごとに取得し直さない）
+    inputs = generator.build_article_inputs()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(_generate_one_article, generator, i, num_articles, inputs)
+            for i in range(num_articles)
+        ]
+        articles = [future.result() for future in futures]
 
     print("\n" + "=" * 60)
     print("[OK] %d 件の記事生成が完了しました" % len(articles))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+締め切り（レイテンシ予算）付きの段階的フォールバック記事生成
+1回の実行に総時間予算を設け、上位の段から順に試して必ず予算内に記事を返す
+
+  full     → 通常のプロンプト（通常モデル）
+  reduced  → 縮小プロンプト（高速モデル）
+  cached   → 直近に生成した記事（ローカル保存）
+  default  → 固定テンプレート
+
+- API を呼ぶ段（timed）は別スレッドで実行し、残り時間で打ち切る（打ち切ったスレッドは裏で完走させる）
+- ローカルの段（local）は即時に実行
+- どの段で記事を返したかを output/generation_log.jsonl に記録
+"""
+
+import os
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+GENERATION_SLO_SECONDS = float(os.getenv('GENERATION_SLO_SECONDS', '120'))
+# full 段の打ち切り時に reduced 段へ残しておく秒数
+REDUCED_TIER_RESERVE_SECONDS = float(os.getenv('REDUCED_TIER_RESERVE_SECONDS', '30'))
+FAST_MODEL_NAME = os.getenv('FAST_MODEL_NAME', 'gemini-1.5-flash-8b')
+REDUCED_PROMPT_TOKEN_BUDGET = int(os.getenv('REDUCED_PROMPT_TOKEN_BUDGET', '2000'))
+
+RECENT_ARTICLE_PATH = Path(os.getenv('RECENT_ARTICLE_PATH', '.cache/recent_article.json'))
+RECENT_ARTICLE_MAX_AGE = int(os.getenv('RECENT_ARTICLE_MAX_AGE', str(48 * 3600)))
+GENERATION_LOG_PATH = Path(os.getenv('GENERATION_LOG_PATH', 'output/generation_log.jsonl'))
+
+
+def _run_with_timeout(func, timeout: float):
+    """func を別スレッドで実行し、timeout 秒以内の結果を返す（超過時は TimeoutError）"""
+    result = queue.Queue(maxsize=1)
+
+    def _target():
+        try:
+            result.put((True, func()))
+        except Exception as e:
+            result.put((False, e))
+
+    threading.Thread(target=_target, name='generation-tier', daemon=True).start()
+    try:
+        ok, value = result.get(timeout=timeout)
+    except queue.Empty:
+        raise TimeoutError(f'{timeout:.0f}秒で打ち切り')
+    if not ok:
+        raise value
+    return value
+
+
+class RecentArticleStore:
+    """直近に生成できた記事を1件だけ保存（cached 段で使用）"""
+
+    def __init__(self, path=RECENT_ARTICLE_PATH, max_age: int = RECENT_ARTICLE_MAX_AGE):
+        self.path = Path(path)
+        self.max_age = max_age
+
+    def scoped(self, name: str) -> 'RecentArticleStore':
+        """記事ごとの保存先（複数記事の並列生成で、cached 段が別の記事の本文を返さないため）"""
+        digest = hashlib.sha256(name.encode('utf-8')).hexdigest()[:16]
+        return RecentArticleStore(self.path.with_name(f'{self.path.stem}.{digest}{self.path.suffix}'), self.max_age)
+
+    def save(self, text: str, tier: str):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'text': text, 'tier': tier, 'created_at': time.time()}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f'直近記事の保存失敗: {str(e)[:50]}')
+
+    def load(self) -> str:
+        """max_age 以内の記事があれば返す"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'直近記事の読み込み失敗: {str(e)[:50]}')
+            return None
+
+        if time.time() - entry.get('created_at', 0) > self.max_age:
+            return None
+        return entry.get('text')
+
+
+class GenerationController:
+    """総時間予算内で上位の段から順に記事生成を試す"""
+
+    def __init__(self, budget_seconds: float = GENERATION_SLO_SECONDS,
+                 recent_store: RecentArticleStore = None, log_path=GENERATION_LOG_PATH):
+        self.budget_seconds = budget_seconds
+        self.recent_store = recent_store or RecentArticleStore()
+        self.log_path = Path(log_path)
+
+    def run(self, timed_tiers: list, local_tiers: list) -> dict:
+        """
+        timed_tiers: [(段名, 関数, 後続の段に残す秒数)]（API 呼び出し、残り時間で打ち切り）
+        local_tiers: [(段名, 関数)]（即時、最後の段は必ず記事を返すこと）
+        戻り値: {'text', 'tier', 'elapsed', 'errors'}
+        """
+        started = time.monotonic()
+        deadline = started + self.budget_seconds
+        errors = {}
+
+        for name, func, reserve in timed_tiers:
+            timeout = deadline - time.monotonic() - reserve
+            if timeout <= 0:
+                errors[name] = '残り時間なし'
+                continue
+            try:
+                text = _run_with_timeout(func, timeout)
+                if text:
+                    self.recent_store.save(text, name)
+                    return self._finish(text, name, started, errors)
+                errors[name] = '空の応答'
+            except Exception as e:
+                errors[name] = str(e)[:80]
+            logger.warning(f'生成段 {name} 失敗: {errors[name]}')
+
+        for name, func in local_tiers:
+            try:
+                text = func()
+                if text:
+                    return self._finish(text, name, started, errors)
+                errors[name] = '該当なし'
+            except Exception as e:
+                errors[name] = str(e)[:80]
+
+        return self._finish('', None, started, errors)
+
+    def _finish(self, text: str, tier: str, started: float, errors: dict) -> dict:
+        result = {
+            'text': text,
+            'tier': tier,
+            'elapsed': round(time.monotonic() - started, 2),
+            'errors': errors,
+        }
+        logger.info(f"✅ 記事生成段: {tier}（{result['elapsed']}秒 / 予算 {self.budget_seconds:.0f}秒）")
+        self.record(result)
+        return result
+
+    def record(self, result: dict):
+        """どの段で記事を返したかを JSON Lines で追記"""
+        entry = {
+            'timestamp': datetime.now().isoformat(),
+            'budget': self.budget_seconds,
+            **{key: value for key, value in result.items() if key != 'text'},
+            'chars': len(result['text']),
+        }
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except Exception as e:
+            logger.warning(f'生成段の記録失敗: {str(e)[:50]}')
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gemini・Nanobanana 呼び出しのヘッジリクエスト（HEDGING_ENABLED=1 で有効）
+1回目の呼び出しが直近の p90 レイテンシまでに返らなければ同じリクエストをもう1本送り、
+先に返った方の結果を使う
+
+- p90 は呼び出し先ごとの直近 HEDGE_WINDOW 回のレイテンシから計算（.cache/latency/ に保存し実行間で共有）
+- 履歴が HEDGE_MIN_SAMPLES 回に満たない間はヘッジしない
+- 直近の呼び出しのうちヘッジした割合が HEDGE_MAX_RATIO を超える場合はヘッジしない（重複コストの上限）
+- 1回目が p90 より前に失敗した場合はヘッジせずにそのまま例外を返す
+"""
+
+import os
+import json
+import math
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HEDGING_ENABLED = os.getenv('HEDGING_ENABLED', '0') == '1'
+HEDGE_WINDOW = int(os.getenv('HEDGE_WINDOW', '50'))
+HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', '10'))
+HEDGE_MAX_RATIO = float(os.getenv('HEDGE_MAX_RATIO', '0.1'))
+LATENCY_HISTORY_DIR = Path(os.getenv('LATENCY_HISTORY_DIR', '.cache/latency'))
+
+
+def percentile(values: list, q: float) -> float:
+    """最近傍法のパーセンタイル（q は 0～100）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(q / 100.0 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class LatencyTracker:
+    """呼び出し先ごとの直近のレイテンシとヘッジ有無の履歴"""
+
+    def __init__(self, name: str, root=LATENCY_HISTORY_DIR, window: int = HEDGE_WINDOW):
+        self.name = name
+        self.path = Path(root) / f'{name}.json'
+        self.window = window
+        self._lock = threading.Lock()
+        self._history = None
+
+    def _load(self) -> list:
+        if self._history is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._history = json.load(f)[-self.window:]
+            except FileNotFoundError:
+                self._history = []
+            except Exception as e:
+                logger.warning(f'レイテンシ履歴の読み込み失敗: {str(e)[:50]}')
+                self._history = []
+        return self._history
+
+    def record(self, latency: float, hedged: bool):
+        with self._lock:
+            history = self._load()
+            history.append({'latency': round(latency, 3), 'hedged': hedged})
+            del history[:-self.window]
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix('.json.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(history, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.warning(f'レイテンシ履歴の保存失敗: {str(e)[:50]}')
+
+    def p90(self, min_samples: int = HEDGE_MIN_SAMPLES) -> float:
+        """直近の p90 レイテンシ（履歴が min_samples 回未満なら None）"""
+        with self._lock:
+            history = self._load()
+            if len(history) < min_samples:
+                return None
+            return percentile([entry['latency'] for entry in history], 90)
+
+    def hedge_ratio(self) -> float:
+        with self._lock:
+            history = self._load()
+            if not history:
+                return 0.0
+            return sum(1 for entry in history if entry['hedged']) / len(history)
+
+
+class Hedger:
+    """p90 を超えた呼び出しに2本目を送って、先に返った結果を使う"""
+
+    def __init__(self, name: str, enabled: bool = HEDGING_ENABLED,
+                 max_ratio: float = HEDGE_MAX_RATIO, tracker: LatencyTracker = None):
+        self.name = name
+        self.enabled = enabled
+        self.max_ratio = max_ratio
+        self.tracker = tracker or LatencyTracker(name)
+
+    def call(self, func, allow_hedge=None):
+        """
+        func() を実行して結果を返す
+        allow_hedge: 2本目を送る直前に呼ぶ関数（False ならヘッジしない。クォータ確認などに使う）
+        """
+        started = time.monotonic()
+        threshold = self.tracker.p90() if self.enabled else None
+        if threshold is None:
+            result = func()
+            self.tracker.record(time.monotonic() - started, hedged=False)
+            return result
+
+        results = queue.Queue()
+
+        def _attempt(index):
+            try:
+                results.put((index, True, func()))
+            except Exception as e:
+                results.put((index, False, e))
+
+        threading.Thread(target=_attempt, args=(0,), name=f'{self.name}-primary', daemon=True).start()
+        try:
+            index, ok, value = results.get(timeout=threshold)
+            pending = 0
+        except queue.Empty:
+            index = None
+            pending = 1
+
+        hedged = False
+        if index is None:
+            if self.tracker.hedge_ratio() < self.max_ratio and (allow_hedge is None or allow_hedge()):
+                hedged = True
+                pending = 2
+                logger.info(f'{self.name}: p90（{threshold:.1f}秒）を超えたためヘッジリクエストを送信')
+                threading.Thread(target=_attempt, args=(1,), name=f'{self.name}-hedge', daemon=True).start()
+
+            # 成功した方を採用（両方失敗したら最後の例外）
+            while pending:
+                index, ok, value = results.get()
+                pending -= 1
+                if ok:
+                    break
+
+        if not ok:
+            raise value
+        if hedged:
+            logger.info(f"{self.name}: {'ヘッジ' if index else '1回目'}のリクエストを採用")
+        self.tracker.record(time.monotonic() - started, hedged=hedged)
+        return value
+
+
+_hedgers = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(name: str) -> Hedger:
+    """呼び出し先ごとに共有する Hedger を取得"""
+    with _hedgers_lock:
+        if name not in _hedgers:
+            _hedgers[name] = Hedger(name)
+        return _hedgers[name]
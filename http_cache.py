@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP レスポンスのディスクキャッシュ（RFC 9111 の主要部分に準拠）
+- Cache-Control: max-age / no-store / no-cache と Expires・Age による鮮度判定
+- Last-Modified のみの場合はヒューリスティック鮮度（経過時間の10%）
+- ETag / Last-Modified を使った条件付きリクエストと 304 の再利用
+- Vary で指定されたリクエストヘッダーが一致する場合のみ再利用
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(os.getenv('HTTP_CACHE_DIR', '.cache/http'))
+
+# キャッシュ可能なステータスコード
+CACHEABLE_STATUSES = {200, 203}
+
+# ヒューリスティック鮮度の上限（秒）
+MAX_HEURISTIC_FRESHNESS = 24 * 3600
+
+
+def _lower_headers(headers) -> dict:
+    return {str(k).lower(): str(v) for k, v in dict(headers or {}).items()}
+
+
+def _http_date(value: str) -> float:
+    """HTTP 日付を UNIX 時刻に変換（解釈できない場合は None）"""
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def parse_cache_control(value: str) -> dict:
+    """Cache-Control ヘッダーをディレクティブの辞書に変換"""
+    directives = {}
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition('=')
+        directives[name.strip().lower()] = arg.strip().strip('"') or True
+    return directives
+
+
+def cache_key(method: str, url: str, params=None) -> str:
+    """メソッド + URL（ソート済みクエリ）からキャッシュキーを生成"""
+    if params:
+        items = sorted(params.items()) if isinstance(params, dict) else sorted(params)
+        url = f'{url}{"&" if "?" in url else "?"}{urlencode(items)}'
+    return hashlib.sha256(f'{method.upper()} {url}'.encode('utf-8')).hexdigest()
+
+
+class CachedResponse:
+    """キャッシュから復元したレスポンス（requests / httpx の Response と同じ主要属性を持つ）"""
+
+    def __init__(self, status_code: int, headers: dict, content: bytes, url: str = ''):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        charset = 'utf-8'
+        for part in self.headers.get('content-type', '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                charset = value.strip('"')
+        return self.content.decode(charset, errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class HttpCache:
+    """ディスクに保存する HTTP キャッシュ（プライベートキャッシュとして動作）"""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = Path(root)
+
+    def _paths(self, key: str) -> tuple:
+        directory = self.root / key[:2]
+        return directory / f'{key}.json', directory / f'{key}.body'
+
+    def lookup(self, key: str, request_headers: dict = None) -> dict:
+        """保存済みエントリを返す（無い・Vary が一致しない場合は None）"""
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'HTTP キャッシュ読み込み失敗: {str(e)[:50]}')
+            return None
+
+        if not body_path.exists():
+            return None
+
+        request_headers = _lower_headers(request_headers)
+        for name, value in entry.get('vary', {}).items():
+            if request_headers.get(name) != value:
+                return None
+
+        entry['body_path'] = str(body_path)
+        return entry
+
+    def freshness_lifetime(self, headers: dict) -> float:
+        """レスポンスの鮮度寿命（秒）"""
+        directives = parse_cache_control(headers.get('cache-control'))
+        if 'max-age' in directives:
+            try:
+                return float(directives['max-age'])
+            except (TypeError, ValueError):
+                return 0.0
+
+        date = _http_date(headers.get('date')) or 0.0
+        expires = _http_date(headers.get('expires'))
+        if expires is not None:
+            return max(0.0, expires - date) if date else 0.0
+
+        last_modified = _http_date(headers.get('last-modified'))
+        if last_modified is not None and date:
+            return min(MAX_HEURISTIC_FRESHNESS, max(0.0, (date - last_modified) * 0.1))
+
+        return 0.0
+
+    def is_fresh(self, entry: dict) -> bool:
+        """エントリが再検証なしで使えるか"""
+        headers = entry['headers']
+        if 'no-cache' in parse_cache_control(headers.get('cache-control')):
+            return False
+
+        try:
+            age_header = float(headers.get('age', 0))
+        except ValueError:
+            age_header = 0.0
+        current_age = age_header + (time.time() - entry['stored_at'])
+        return current_age < self.freshness_lifetime(headers)
+
+    def conditional_headers(self, entry: dict) -> dict:
+        """再検証用の If-None-Match / If-Modified-Since ヘッダー"""
+        headers = {}
+        if entry['headers'].get('etag'):
+            headers['If-None-Match'] = entry['headers']['etag']
+        if entry['headers'].get('last-modified'):
+            headers['If-Modified-Since'] = entry['headers']['last-modified']
+        return headers
+
+    def store(self, key: str, response, request_headers: dict = None) -> bool:
+        """キャッシュ可能なレスポンスを保存"""
+        if response.status_code not in CACHEABLE_STATUSES:
+            return False
+
+        headers = _lower_headers(response.headers)
+        directives = parse_cache_control(headers.get('cache-control'))
+        if 'no-store' in directives or headers.get('vary', '').strip() == '*':
+            return False
+
+        # 鮮度情報も検証子も無いレスポンスは再利用できないため保存しない
+        if not (self.freshness_lifetime(headers) > 0 or 'etag' in headers or 'last-modified' in headers):
+            return False
+
+        request_headers = _lower_headers(request_headers)
+        vary = {
+            name.strip().lower(): request_headers.get(name.strip().lower())
+            for name in headers.get('vary', '').split(',') if name.strip()
+        }
+
+        entry = {
+            'status_code': response.status_code,
+            'url': str(getattr(response, 'url', '')),
+            'headers': headers,
+            'vary': vary,
+            'stored_at': time.time(),
+        }
+        self._write(key, entry, response.content)
+        return True
+
+    def revalidated(self, key: str, entry: dict, response) -> CachedResponse:
+        """304 応答のヘッダーでエントリを更新し、保存済み本文を返す"""
+        headers = dict(entry['headers'])
+        headers.update({
+            name: value for name, value in _lower_headers(response.headers).items()
+            if name not in ('content-length', 'content-encoding', 'transfer-encoding')
+        })
+        entry = dict(entry, headers=headers, stored_at=time.time())
+        body_path = entry.pop('body_path')
+        self._write(key, entry, None)
+        entry['body_path'] = body_path
+        return self.to_response(entry)
+
+    def to_response(self, entry: dict) -> CachedResponse:
+        with open(entry['body_path'], 'rb') as f:
+            content = f.read()
+        return CachedResponse(entry['status_code'], entry['headers'], content, entry.get('url', ''))
+
+    def _write(self, key: str, entry: dict, content: bytes):
+        """メタデータと本文をアトミックに書き出す（content が None なら本文は据え置き）"""
+        meta_path, body_path = self._paths(key)
+        try:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            if content is not None:
+                tmp_body = body_path.with_suffix('.body.tmp')
+                with open(tmp_body, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_body, body_path)
+
+            tmp_meta = meta_path.with_suffix('.json.tmp')
+            with open(tmp_meta, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_meta, meta_path)
+        except Exception as e:
+            logger.warning(f'HTTP キャッシュ保存失敗: {str(e)[:50]}')
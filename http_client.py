@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+パイプライン共通の HTTP トランスポート
+- keep-alive 接続プール（ホストごとに接続を再利用）
+- httpx + h2 がインストールされていれば HTTP/2 を使用
+- 統一したタイムアウト・リトライ方針
+- ホストごとの同時接続数の制限
+- GET レスポンスのディスクキャッシュ（条件付きリクエスト・304 再利用）
+"""
+
+import os
+import time
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+# NameResolutionError（名前解決の失敗）も NewConnectionError のサブクラス
+from urllib3.exceptions import NewConnectionError
+
+from rate_limit import backoff_delay, parse_retry_after
+from http_cache import HttpCache, cache_key
+
+# HTTP/2 対応クライアント（オプション）
+try:
+    import httpx
+    import h2  # noqa: F401  httpx の HTTP/2 サポートに必要
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))
+DEFAULT_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+DEFAULT_PER_HOST_LIMIT = int(os.getenv('HTTP_PER_HOST_LIMIT', '4'))
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', '1') != '0'
+
+# プールに保持するホスト数と、ホストごとの keep-alive 接続数
+POOL_HOSTS = 16
+POOL_CONNECTIONS_PER_HOST = 8
+
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+# リトライ対象のステータスコード
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# 冪等なメソッドはステータスエラーでもリトライする（それ以外は 429/503 と送信前の接続失敗のみ）
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+NON_IDEMPOTENT_RETRY_STATUSES = {429, 503}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (compatible; RWANewsBot/4.0)',
+}
+
+
+def _is_connection_error(exc: Exception) -> bool:
+    """リクエスト送信前後の接続失敗・タイムアウトか判定"""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return httpx is not None and isinstance(exc, httpx.TransportError)
+
+
+def _is_unsent_error(exc: Exception) -> bool:
+    """
+    リクエストを送信する前の接続失敗か判定（読み取りタイムアウト等、送信済みの可能性がある失敗は含めない）
+    requests の ConnectionError は送信後の切断（ProtocolError・RemoteDisconnected）も含むため、
+    接続確立・名前解決の失敗（NewConnectionError・NameResolutionError）が原因のものだけに限る
+    """
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.ConnectionError):
+        # requests は urllib3 の MaxRetryError（reason に元の例外）を包んで送出する
+        reason = exc.args[0] if exc.args else None
+        reason = getattr(reason, 'reason', reason)
+        return isinstance(reason, NewConnectionError)
+    return httpx is not None and isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+class HttpClient:
+    """接続プール付きの共有 HTTP クライアント"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, max_retries: int = DEFAULT_MAX_RETRIES,
+                 per_host_limit: int = DEFAULT_PER_HOST_LIMIT, http2: bool = True,
+                 cache: HttpCache = None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.per_host_limit = per_host_limit
+        self.cache = cache
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+        if http2 and httpx is not None:
+            self.backend = 'httpx'
+            self._session = httpx.Client(
+                http2=True,
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=POOL_HOSTS * POOL_CONNECTIONS_PER_HOST,
+                    max_keepalive_connections=POOL_HOSTS * POOL_CONNECTIONS_PER_HOST,
+                ),
+            )
+        else:
+            self.backend = 'requests'
+            self._session = requests.Session()
+            self._session.headers.update(DEFAULT_HEADERS)
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_CONNECTIONS_PER_HOST)
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+
+        logger.info(f'HTTP クライアント初期化: {self.backend}（HTTP/2: {self.backend == "httpx"}）')
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """ホストごとの同時実行数セマフォを取得"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+            return slot
+
+    def request(self, method: str, url: str, timeout: float = None,
+                max_retries: int = None, cache: bool = True, **kwargs):
+        """リクエストを送信（GET はキャッシュが有効ならディスクキャッシュを経由）"""
+        method = method.upper()
+        if method == 'GET' and cache and self.cache is not None:
+            return self._cached_get(url, timeout, max_retries, **kwargs)
+        return self._send(method, url, timeout, max_retries, **kwargs)
+
+    def _cached_get(self, url: str, timeout: float, max_retries: int, **kwargs):
+        """鮮度内ならキャッシュを返し、期限切れなら条件付き GET で再検証"""
+        request_headers = {**DEFAULT_HEADERS, **(kwargs.get('headers') or {})}
+        key = cache_key('GET', url, kwargs.get('params'))
+        entry = self.cache.lookup(key, request_headers)
+
+        if entry and self.cache.is_fresh(entry):
+            logger.info(f'HTTP キャッシュヒット: {urlsplit(url).netloc}')
+            return self.cache.to_response(entry)
+
+        if entry:
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **self.cache.conditional_headers(entry)}
+
+        response = self._send('GET', url, timeout, max_retries, **kwargs)
+
+        if entry and response.status_code == 304:
+            logger.info(f'HTTP キャッシュ再検証（304）: {urlsplit(url).netloc}')
+            return self.cache.revalidated(key, entry, response)
+
+        self.cache.store(key, response, request_headers)
+        return response
+
+    def _send(self, method: str, url: str, timeout: float = None,
+              max_retries: int = None, **kwargs):
+        """タイムアウト・リトライ・ホスト単位の同時実行制限付きでリクエストを送信"""
+        timeout = self.timeout if timeout is None else timeout
+        max_retries = self.max_retries if max_retries is None else max_retries
+        idempotent = method in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else NON_IDEMPOTENT_RETRY_STATUSES
+        # 冪等でないメソッドは送信前の接続失敗のみ再試行（読み取りタイムアウト後の再送で二重実行しないため）
+        retryable_error = _is_connection_error if idempotent else _is_unsent_error
+
+        attempt = 0
+        while True:
+            try:
+                with self._host_slot(url):
+                    response = self._session.request(method, url, timeout=timeout, **kwargs)
+            except Exception as e:
+                if not retryable_error(e) or attempt >= max_retries:
+                    raise
+                delay = backoff_delay(attempt, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+                logger.warning(f'{method} {urlsplit(url).netloc}: 接続失敗、{delay:.1f}秒後に再試行 - {str(e)[:50]}')
+            else:
+                if response.status_code not in retry_statuses or attempt >= max_retries:
+                    return response
+                delay = max(backoff_delay(attempt, RETRY_BASE_DELAY, RETRY_MAX_DELAY),
+                            min(parse_retry_after(response.headers), RETRY_MAX_DELAY))
+                logger.warning(f'{method} {urlsplit(url).netloc}: ステータス {response.status_code}、{delay:.1f}秒後に再試行')
+
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self._session.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """プロセス全体で共有する HTTP クライアントを取得"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient(cache=HttpCache() if HTTP_CACHE_ENABLED else None)
+        return _shared_client
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gemini 応答のコンテンツアドレス型キャッシュ
+正規化したプロンプト + モデル名 + 生成パラメータのハッシュをキーに応答を保存し、
+再実行・リトライ・複数記事生成で同じプロンプトの LLM 呼び出しを省略する
+
+- TTL を過ぎたエントリは無効
+- 合計サイズが上限を超えたら最終アクセスの古い順に削除
+- force / RWA_FORCE_REGENERATE=1 でキャッシュを使わず再生成
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import textwrap
+import threading
+import unicodedata
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(os.getenv('LLM_CACHE_DIR', '.cache/llm'))
+DEFAULT_TTL = int(os.getenv('LLM_CACHE_TTL', str(24 * 3600)))
+DEFAULT_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+
+# 強制再生成フラグ（キャッシュを読まずに生成し、結果は保存する）
+FORCE_REGENERATE = os.getenv('RWA_FORCE_REGENERATE', '0') == '1'
+
+
+def normalize_prompt(prompt: str) -> str:
+    """インデント・行末空白・連続空行・Unicode 表記揺れを正規化"""
+    text = unicodedata.normalize('NFC', textwrap.dedent(prompt))
+    text = '\n'.join(line.rstrip() for line in text.splitlines())
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+def make_key(prompt: str, model: str, generation_params: dict = None) -> str:
+    """プロンプト・モデル・生成パラメータからキャッシュキー（SHA-256）を生成"""
+    payload = json.dumps({
+        'prompt': normalize_prompt(prompt),
+        'model': model,
+        'params': generation_params or {},
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """ディスク上の LLM 応答キャッシュ"""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, ttl: int = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f'{key}.json'
+
+    def get(self, key: str) -> str:
+        """有効なキャッシュがあれば応答テキストを返す"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'LLM キャッシュ読み込み失敗: {str(e)[:50]}')
+            return None
+
+        if time.time() - entry.get('created_at', 0) > self.ttl:
+            return None
+
+        # 最終アクセス時刻を更新（サイズ上限時の削除順に使う）
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get('text')
+
+    def put(self, key: str, text: str, **meta):
+        """応答テキストを保存し、必要なら古いエントリを削除"""
+        path = self._path(key)
+        entry = {'text': text, 'created_at': time.time(), **meta}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f'LLM キャッシュ保存失敗: {str(e)[:50]}')
+            return
+
+        self.evict()
+
+    def evict(self):
+        """期限切れエントリと、サイズ上限を超えた分を最終アクセスの古い順に削除"""
+        with self._lock:
+            now = time.time()
+            files = []
+            for path in self.root.glob('*/*.json'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.ttl:
+                    path.unlink(missing_ok=True)
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+rwa_context.MACRO_CONTEXT_NEWS の転置インデックス（BM25）
+本日のトレンドキーワード・ニュース スニペットに関連する歴史的マクロ文脈を上位 k 件で取得する
+
+- 英数字は単語単位、日本語（漢字・かな）は文字 bigram に分割して索引（形態素解析の辞書が不要）
+- インデックスはモジュール読み込み時に1回だけ構築
+- 検索はクエリ語のポスティングだけを走査するため、件数が数千件に増えても線形スキャンにならない
+"""
+
+import re
+import math
+import heapq
+import unicodedata
+from collections import Counter, defaultdict
+
+import rwa_context
+
+# 英数字の単語 / 日本語（漢字・ひらがな・カタカナ）の連続
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[぀-ヿ㐀-鿿豈-﫿]+')
+_MIN_WORD_CHARS = 2
+
+
+def tokenize(text: str) -> list:
+    """英数字は単語、日本語は文字 bigram（1文字だけの連続はその1文字）に分割"""
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(unicodedata.normalize('NFKC', text or '').lower()):
+        if run[0].isascii():
+            if len(run) >= _MIN_WORD_CHARS:
+                tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class BM25Index:
+    """文書リストに対する BM25 転置インデックス"""
+
+    def __init__(self, documents: list, k1: float = 1.5, b: float = 0.75):
+        self.documents = list(documents)
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.doc_lengths = []
+
+        for doc_id, document in enumerate(self.documents):
+            counts = Counter(tokenize(document))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((doc_id, tf))
+
+        count = len(self.documents)
+        self.avg_length = sum(self.doc_lengths) / count if count else 0.0
+        self.idf = {
+            term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def scores(self, query: str) -> dict:
+        """クエリ語を含む文書だけの {文書番号: スコア}"""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, k: int = 10) -> list:
+        """スコア上位 k 件の (文書番号, スコア)（同点は文書の並び順）"""
+        scores = self.scores(query)
+        return heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+# 歴史的マクロ文脈のインデックス（読み込み時に構築）
+MACRO_INDEX = BM25Index(rwa_context.MACRO_CONTEXT_NEWS)
+
+
+def top_macro_context(query: str, k: int = 10, exclude=()) -> list:
+    """
+    クエリに関連する歴史的マクロ文脈を上位 k 件返す（exclude に含まれる項目は除く）
+    一致が k 件に満たない分はライブラリの先頭から補う（毎回同じ結果になるよう乱択はしない）
+    """
+    excluded = set(exclude)
+    allowed = [i for i, document in enumerate(MACRO_INDEX.documents) if document not in excluded]
+    allowed_ids = set(allowed)
+    ranked = [doc_id for doc_id, _ in MACRO_INDEX.search(query, k + len(MACRO_INDEX.documents) - len(allowed))
+              if doc_id in allowed_ids][:k]
+    if len(ranked) < k:
+        chosen = set(ranked)
+        ranked += [i for i in allowed if i not in chosen][:k - len(ranked)]
+    return [MACRO_INDEX.documents[i] for i in ranked]
@@ -14,17 +14,35 @@ Google Trends + AI生成 + 画像生成 + GitHub Pages自動公開
 """
 
 import os
-import json
+import time
+import asyncio
+import threading
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
-import requests
-import random
 
 # Google Trends と AI ライブラリ
-from pytrends.request import TrendReq
-import google.generativeai as genai
+from trends_fetcher import BatchedTrendsFetcher, TRENDS_FETCH_BUDGET
+from trends_cache import TrendsCache
+from http_client import get_client
+from market_data import fetch_market_snapshot
+from market_store import MarketStore
+from llm_cache import LLMCache, make_key, FORCE_REGENERATE
+from article_stream import StreamingPageWriter, iter_with_deadline
+from article_sections import generate_sections, stitch_sections
+from context_cache import create_context_cache
+from context_compiler import get_compiler
+from gemini_models import configure_once, model_settings
+from generation_controller import (
+    GenerationController, RecentArticleStore, FAST_MODEL_NAME, REDUCED_PROMPT_TOKEN_BUDGET, REDUCED_TIER_RESERVE_SECONDS,
+    GENERATION_SLO_SECONDS
+)
+from hedging import get_hedger
+from token_snapshot import SNAPSHOT_ANCHOR, render_snapshot_body, render_snapshot_section, insert_snapshot_section
+from news_fanout import fetch_top_tier_news, dedupe_results
+from feed_ingest import get_ingestor, FEED_INGEST_ENABLED, FEED_MIN_RESULTS
+from prompt_budget import PromptBudgeter, PROMPT_TOKEN_BUDGET, compact_json, estimate_tokens, record_prompt_metrics
 
 # 画像生成ライブラリ
 from PIL import Image, ImageDraw, ImageFont
@@ -62,10 +80,18 @@ except ImportError:
 # マクロ文脈ライブラリ（歴史的背景の理解）
 try:
     import rwa_context
+    from macro_index import top_macro_context
 except ImportError:
     logger.warning('rwa_context.py が見つかりません。マクロ文脈は使用しません')
     rwa_context = None
 
+# ファンダメンタルズスコアリング（NumPy が必要）
+try:
+    from fundamentals_scoring import FundamentalsScorer
+except ImportError as e:
+    logger.warning(f'fundamentals_scoring を読み込めません（{str(e)[:50]}）。スコアリングは使用しません')
+    FundamentalsScorer = None
+
 # RWA関連ワード（トレンド取得用）
 RWA_KEYWORDS = [
     'Ondo', 'PAXG', 'RWA', 'tokenized assets',
@@ -73,6 +99,45 @@ RWA_KEYWORDS = [
     '不動産トークン', '実物資産トークン化'
 ]
 
+# データ取得ステージ設定（同時実行数・ソースごとのタイムアウト秒）
+ACQUISITION_CONCURRENCY = int(os.getenv('ACQUISITION_CONCURRENCY', '6'))
+SOURCE_TIMEOUTS = {
+    'trends': 90,
+    'coingecko': 15,
+    'sentiment': 30,
+    'image': 40,
+}
+
+# ソースの処理自体もタイムアウト内に終わるよう、下位の呼び出しに渡す期限（秒）
+TRENDS_SOURCE_BUDGET = min(TRENDS_FETCH_BUDGET, SOURCE_TIMEOUTS['trends'] - 15)
+IMAGE_REQUEST_TIMEOUT = SOURCE_TIMEOUTS['image'] - 10
+
+# プロンプトに含める歴史的マクロ文脈の件数（本日のトレンド・ニュースとの関連度上位）
+MACRO_CONTEXT_TOP_K = int(os.getenv('MACRO_CONTEXT_TOP_K', '10'))
+
+# 実行ごとに変わらない長期的な背景（固定クエリで選ぶマクロ文脈）。ニュースに依存しないため、
+# これだけを使うプロンプト（セクション単位の LLM キャッシュ等）は入力が同じなら毎回同じキーになる
+MACRO_BACKGROUND_QUERY = ' '.join(RWA_KEYWORDS)
+MACRO_BACKGROUND_TOP_K = int(os.getenv('MACRO_BACKGROUND_TOP_K', '5'))
+
+# ストリーミング記事生成（ARTICLE_STREAMING=0 で一括生成）と打ち切りまでの秒数
+ARTICLE_STREAMING = os.getenv('ARTICLE_STREAMING', '1') != '0'
+STREAM_DEADLINE_SECONDS = float(os.getenv('STREAM_DEADLINE_SECONDS', '90'))
+
+# 記事生成モード（single: 1回の呼び出しで全文 / sections: セクションごとに並列生成して連結）
+# 入力が変わらないセクションの再利用（article_sections）は sections の時だけ働く
+ARTICLE_GENERATION_MODE = os.getenv('ARTICLE_GENERATION_MODE', 'single')
+
+# 記事用画像のプロンプト（画像タイプ, プロンプト）
+IMAGE_PROMPTS = [
+    ('trend_analysis',
+     'RWA institutional adoption roadmap, regulatory framework development, central bank digital currency integration, professional infographic, blue and purple gradient'),
+    ('investment_strategy',
+     'Real World Assets ecosystem diagram, blockchain infrastructure connecting TradFi institutions, tokenization layers, technical architecture, modern design'),
+    ('market_outlook',
+     'Global RWA market structure, asset classes taxonomy, insurance, treasury bonds, real estate, commodities, professional financial illustration'),
+]
+
 # RWA関連の主要ソース（参照元）
 EVIDENCE_SOURCES = [
     {'name': 'Coin Telegraph', 'url': 'https://cointelegraph.jp', 'category': 'ニュース'},
@@ -99,7 +164,29 @@ class RWANewsGenerator:
         if not self.api_key:
             raise ValueError('GOOGLE_API_KEY が設定されていません')
 
-        genai.configure(api_key=self.api_key)
+        # genai.configure はプロセスで1回だけ（モデルクライアントは gemini_models で共有）
+        configure_once(self.api_key)
+
+        # Google Trends のディスクキャッシュ（実行間で共有）
+        self.trends_cache = TrendsCache()
+
+        # マーケットスナップショットの履歴（7日/30日比較用）
+        self.market_store = MarketStore()
+        self.market_snapshot = {}
+        self.fundamentals_scores = {}
+
+        # Gemini 応答キャッシュ（同一プロンプトの再生成を省略）
+        self.llm_cache = LLMCache()
+
+        # プロンプトの静的プレフィックスのコンテキストキャッシュ
+        self.context_cache = create_context_cache()
+
+        # Gemini のリクエスト数・トークン数クォータ（並列生成時に設定）
+        self.gemini_quota = None
+
+        # 直近の記事生成で使われた段（full / reduced / cached / default）と、cached 段用の直近記事
+        self.generation_tier = None
+        self.recent_articles = RecentArticleStore()
 
         # VADER Sentiment Analyzer を初期化
         if SentimentIntensityAnalyzer:
@@ -110,28 +197,21 @@ class RWANewsGenerator:
         logger.info('認証情報を環境変数から読み込みました')
 
     async def fetch_trends(self) -> dict:
-        """Google Trendsからトレンドデータを取得"""
+        """Google Trendsからトレンドデータを取得（ブロッキング処理はスレッドで実行）"""
+        return await asyncio.to_thread(self._fetch_trends_sync)
+
+    def _fetch_trends_sync(self) -> dict:
+        """Google Trendsからトレンドデータを取得（同期版・5キーワード単位のバッチ取得）"""
         try:
             logger.info('Google Trendsからトレンドデータを取得中...')
-            pytrends = TrendReq(hl='ja-JP', tz=540)
-
-            trends_data = {}
-            for keyword in RWA_KEYWORDS:
-                try:
-                    pytrends.build_payload(
-                        kw_list=[keyword],
-                        timeframe='now 7-d',
-                        geo='JP'
-                    )
-                    interest_overtime = pytrends.interest_over_time()
+            fetcher = BatchedTrendsFetcher(
+                timeframe='now 7-d', geo='JP', hl='ja-JP', tz=540,
+                cache=self.trends_cache, budget=TRENDS_SOURCE_BUDGET
+            )
+            trends_data = fetcher.fetch(RWA_KEYWORDS)
 
-                    if not interest_overtime.empty:
-                        trend_score = int(interest_overtime.iloc[-1, 0])
-                        trends_data[keyword] = trend_score
-                        logger.info(f'{keyword}: トレンドスコア {trend_score}')
-                except Exception as e:
-                    logger.warning(f'{keyword}: トレンド取得失敗 - {str(e)[:50]}')
-                    trends_data[keyword] = 0
+            for keyword, trend_score in trends_data.items():
+                logger.info(f'{keyword}: トレンドスコア {trend_score}')
 
             return trends_data
 
@@ -140,27 +220,20 @@ class RWANewsGenerator:
             return {kw: 0 for kw in RWA_KEYWORDS}
 
     async def fetch_coingecko_data(self) -> dict:
-        """CoinGecko API から仮想資産データを取得"""
+        """CoinGecko API から仮想資産データを取得（ブロッキング処理はスレッドで実行）"""
+        return await asyncio.to_thread(self._fetch_coingecko_data_sync)
+
+    def _fetch_coingecko_data_sync(self) -> dict:
+        """CoinGecko API から厳選50銘柄のマーケットデータを取得（同期版）"""
         try:
             logger.info('CoinGecko からデータを取得中...')
-            response = requests.get(
-                'https://api.coingecko.com/api/v3/simple/price',
-                params={
-                    'ids': 'ondo,xdc-network,mantle,aave,curve-dao-token',
-                    'vs_currencies': 'jpy,usd',
-                    'include_market_cap': 'true',
-                    'include_24hr_vol': 'true',
-                    'include_24hr_change': 'true'
-                },
-                timeout=10
-            )
+            snapshot = fetch_market_snapshot(vs_currency='usd')
 
-            if response.status_code == 200:
-                data = response.json()
+            if snapshot['tokens']:
                 logger.info('✅ CoinGecko データ取得成功')
-                return data
+                return snapshot
             else:
-                logger.warning(f'CoinGecko エラー: {response.status_code}')
+                logger.warning('CoinGecko エラー: マーケットデータが空です')
                 return {}
 
         except Exception as e:
@@ -210,224 +283,367 @@ class RWANewsGenerator:
             logger.warning(f'画像生成失敗: {str(e)}')
             return None
 
-    def generate_news_article(self, trends_data: dict) -> str:
-        """ファンダメンタルズ + マクロ文脈 + トップティアメディア情報ベースの RWA ニュース記事を生成"""
-        try:
-            logger.info('ファンダメンタルズ + マクロ文脈 + トップティアメディア情報で記事を生成中...')
+    def build_article_inputs(self, trends_data: dict = None) -> dict:
+        """記事生成に使う共通入力（複数記事の生成時は1回だけ取得して共有する）"""
+        # トップティアメディアからニュースを検索
+        top_tier_news = self._search_top_tier_news('RWA market news')
 
-            # config.py から RWA エコシステム情報を取得
-            fundamentals_context = self._build_fundamentals_context()
-
-            # rwa_context.py から マクロ文脈を取得
-            macro_context = self._build_macro_context()
-
-            # トップティアメディアからニュースを検索
-            top_tier_news = self._search_top_tier_news('RWA market news')
-
-            # ニュース スニペットを整形
-            news_snippets_text = "\n".join([f"  - {snippet}" for snippet in top_tier_news.get('snippets', [])])
-
-            prompt = f"""
-            【RWA（Real World Assets）ファンダメンタルズ + マクロ文脈分析記事の生成】
-
-            【本日のトレンドデータ】
-            {json.dumps(trends_data, ensure_ascii=False, indent=2)}
-
-            【RWA市場の構造的背景情報】
-            {fundamentals_context}
-
-            【RWA市場の歴史的マクロ文脈】
-            {macro_context}
-
-            【本日のトップティアメディア情報（厳選ソースのみ）】
-            以下は、{', '.join(top_tier_news.get('domains', [])[:3])} などのトップティアメディアから抽出した信頼度の高いニュース・分析です。
-            SEOスパムや低品質サイトは完全に除外しています：
-{news_snippets_text}
-
-            執筆者: xdc.master（不動産運営者・長期インベスター視点）
-
-            以下の形式で、RWAセクターの【実需】と【ファンダメンタルズ】に焦点を当てた深い分析記事を生成してください：
-
-            【重要な指示】
-            - これは価格騰落予測ではなく、業界動向・制度整備・機関参入・規制クリアに基づく分析です
-            - 上記の「歴史的マクロ文脈」と本日のニュース・トレンドを関連付けて、『なぜ今この動きが起きているのか』『背景に何があるのか』を深く説明してください
-            - 例：『XDCの取引高が増加』という日々のニュースなら、『XDC Network の ICC（国際商業会議所）との提携により、貿易金融のオンチェーン化が実現しつつあるからこそ、機関投資家が資金を流入させている』というように深い考察（Why）を記述
-            - **トップティアメディア情報の活用**: 上記のトップティアメディア（Bloomberg、CoinDesk、The Block、Messari等）から抽出したニュース・分析を参考に、記事に具体的な事例や統計数字を含める
-            - **信頼性と根拠**: 個人ブログやまとめサイトではなく、トップティアソースのスニペットを基に執筆するため、より説得力のある記事を生成してください
-
-            【記事構成】
-            1. **冒頭** - 本日のトレンドと、その背景にあるマクロ的な文脈
-            2. **機関投資家参入の進捗** - BlackRock、Franklin Templeton などの動き（具体例を示す）
-            3. **規制フレームワークの整備状況** - SEC、金融庁、FCAなどの最新ガイダンス
-            4. **技術・インフラの進化** - スケーラビリティ、セキュリティ、相互運用性
-            5. **エコシステム提携と実需の形成** - TradFi との統合、大手機関との協業（なぜこれが重要か説明）
-            6. **主要なRWAプロジェクト群** - 厳選50銘柄の分類別スナップショット
-            7. **長期投資家向けの視点** - 価格投機ではなく実需ベースの判断軸
-            8. **結論** - RWAセクターへの構造的な見立て
-
-            【制約】
-            - 1,800～2,200文字程度
-            - 日本語
-            - 価格予測や『煽り』表現は避け、事実ベースの分析
-            - ONDO、XDC、LINK、Chainlink、MakerDAO、Centrifuge など実在プロジェクトを具体例として含める
-            - 機関投資家・長期投資家向けの専門的かつ冷静な内容
-            - ファンダメンタルズ5軸（機関投資家参入、規制、技術、提携、市場動向）を織り込む
-            - 歴史的な背景（上記マクロ文脈）との関連性を示す記述を含める
-            """
-
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            response = model.generate_content(prompt)
-
-            if response.text:
-                logger.info('✅ ファンダメンタルズ + マクロ文脈 + トップティアメディア情報ベース記事生成完了')
-                return response.text
-            else:
-                logger.error('AI 応答が空です')
-                return self._get_default_article()
+        # 本日のトレンドキーワードとニュース スニペットで関連するマクロ文脈を検索
+        query = ' '.join(self._trends_query_terms(trends_data) + list(top_tier_news.get('snippets', [])))
 
-        except Exception as e:
-            logger.error(f'AI 記事生成失敗: {str(e)}')
-            return self._get_default_article()
+        # 長期的な背景は固定クエリで選ぶ（本日のマクロ文脈からは同じ項目を除く）
+        background = top_macro_context(MACRO_BACKGROUND_QUERY, MACRO_BACKGROUND_TOP_K) if rwa_context else []
 
-    def _build_fundamentals_context(self) -> str:
-        """config.py から RWA ファンダメンタルズコンテキストを構築"""
-        if not config:
-            return ""
+        return {
+            # config.py から RWA エコシステム情報を取得
+            'fundamentals_context': self._build_fundamentals_context(),
+            # rwa_context.py から マクロ文脈を取得（クエリ依存・実行ごとに変わる）
+            'macro_context': self._build_macro_context(query, exclude=background),
+            'macro_background': self._format_macro_context(background),
+            # 市場データから算出したファンダメンタルズスコア（run() で算出済みの場合のみ）
+            'fundamentals_scores': self._format_fundamentals_scores(),
+            'top_tier_news': top_tier_news,
+        }
 
-        context_parts = []
-
-        # RWA厳選50銘柄の概要
-        context_parts.append("【RWA厳選50銘柄の分布】")
-        for category, tokens in config.RWA_TOKENS.items():
-            token_names = ", ".join([t['symbol'] for t in tokens])
-            context_parts.append(f"  - {category}: {token_names}")
-
-        # キーパーソンの最新動向例
-        context_parts.append("\n【業界キーパーソン30名】")
-        if len(config.KEY_FIGURES) >= 5:
-            context_parts.append("  主要人物（抜粋）:")
-            for person in config.KEY_FIGURES[:5]:
-                context_parts.append(f"    - {person['name']} ({person['affiliation']}): {person['recent_focus']}")
-
-        # ファンダメンタルズスコアリング軸
-        context_parts.append("\n【ファンダメンタルズスコアリング5軸】")
-        for category, data in config.FUNDAMENTALS_CATEGORIES.items():
-            weight_pct = data['weight'] * 100
-            indicators = data['indicators'][:2]  # 最初の2つのみ表示
-            context_parts.append(f"  - {category} ({weight_pct}%): {', '.join(indicators)}")
-
-        # ニュースカテゴリ
-        context_parts.append("\n【ニュース分類カテゴリ】")
-        categories = ", ".join(config.NEWS_CATEGORIES[:6])
-        context_parts.append(f"  {categories}...")
-
-        # 信頼度ソース
-        context_parts.append("\n【信頼度の高いニュースソース】")
-        high_sources = config.CREDIBILITY_SOURCES['超高'][:3]
-        context_parts.append(f"  超高: {', '.join(high_sources)}")
+    def _trends_query_terms(self, trends_data: dict) -> list:
+        """トレンドデータから検索語を取り出す（スコアが 0 のキーワード・時刻は除く）"""
+        terms = []
+        for key, value in (trends_data or {}).items():
+            if key == 'timestamp':
+                continue
+            if isinstance(value, (int, float)):
+                if value > 0:
+                    terms.append(key)
+            elif isinstance(value, str):
+                terms.append(value)
+            elif isinstance(value, list):
+                terms.extend(str(item) for item in value)
+        return terms
+
+    def _build_article_context(self, trends_data: dict, inputs: dict = None,
+                               token_budget: int = None) -> tuple:
+        """
+        記事全体・各セクションで共通のコンテキストを構築
+        戻り値: (静的プレフィックス（執筆方針・ファンダメンタルズ）, 実行ごとのデータブロック {名前: テキスト})
+        データブロック（trends / scores / background / macro / news）はセクションごとに使う分だけをプロンプトに含める
+        プレフィックスのファンダメンタルズ（config 由来）と background（固定クエリのマクロ文脈）は予算調整の対象外とし、
+        他のデータ量に関わらず同じテキストにする（プレフィックスのコンテキストキャッシュ・セクションの LLM キャッシュのキーを安定させるため）
+        """
+        if inputs is None:
+            inputs = self.build_article_inputs(trends_data)
+
+        top_tier_news = inputs['top_tier_news']
+        domains = top_tier_news.get('domains', [])
+
+        # ニュース スニペットを整形
+        news_snippets_text = "\n".join([f"  - {snippet}" for snippet in top_tier_news.get('snippets', [])])
+
+        # 実行ごとのデータ部分をトークン予算内に収める（優先度: トレンド > ニュース > スコア > マクロ文脈）
+        stable = {
+            'fundamentals': inputs.get('fundamentals_context', ''),
+            'background': inputs.get('macro_background', ''),
+        }
+        empty_prefix, empty_blocks = self._render_article_context(stable, domains)
+        fixed_tokens = estimate_tokens(empty_prefix + ''.join(empty_blocks.values()))
+        token_budget = PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+        budgeter = PromptBudgeter(max(0, token_budget - fixed_tokens))
+        budgeter.add('trends', compact_json(trends_data), priority=60)
+        budgeter.add('news', news_snippets_text, priority=50)
+        budgeter.add('scores', inputs.get('fundamentals_scores', ''), priority=40)
+        budgeter.add('macro', inputs['macro_context'], priority=20)
+
+        prefix, blocks = self._render_article_context({**budgeter.fit(), **stable}, domains)
+
+        # 複数記事の生成時は記事ごとの切り口を加える（記事ごとに異なり、再実行では同じプロンプトになる）
+        if inputs.get('angle'):
+            blocks['angle'] = f"""
+        【この記事の切り口】
+        {inputs['angle']}
+"""
 
-        return "\n".join(context_parts)
+        metrics = budgeter.metrics()
+        prompt_tokens = estimate_tokens(prefix + ''.join(blocks.values()))
+        record_prompt_metrics(metrics, fixed_tokens=fixed_tokens, prompt_tokens=prompt_tokens,
+                              prefix_tokens=estimate_tokens(prefix))
+        logger.info(f"プロンプト: {prompt_tokens} トークン（データ {metrics['tokens_in']} → {metrics['tokens_out']}）")
+        return prefix, blocks
 
-    def _generate_advanced_search_query(self, keyword: str, num_domains: int = 4) -> tuple:
-        """高度な検索クエリを生成：ターゲットドメインのみを対象に"""
-        try:
-            if not config or not hasattr(config, 'TARGET_DOMAINS'):
-                logger.warning('TARGET_DOMAINS が見つかりません')
-                return None, []
+    def _render_article_context(self, segments: dict, domains: list) -> tuple:
+        """予算調整済みのセグメントを (静的プレフィックス, 実行ごとのデータブロック) のテンプレートに埋め込む"""
+        prefix = f"""
+        【RWA（Real World Assets）ファンダメンタルズ + マクロ文脈分析記事の生成】
 
-            import random
+        【RWA市場の構造的背景情報】
+        {segments.get('fundamentals', '')}
 
-            # ランダムに 3～5 個のドメインを選択
-            selected_domains = random.sample(
-                config.TARGET_DOMAINS,
-                min(num_domains, len(config.TARGET_DOMAINS))
-            )
+        執筆者: xdc.master（不動産運営者・長期インベスター視点）
 
-            # site: 演算子を使った検索クエリを構築
-            site_filters = " OR ".join([f"site:{domain}" for domain in selected_domains])
-            advanced_query = f'"{keyword}" RWA ({site_filters})'
+        以下の形式で、RWAセクターの【実需】と【ファンダメンタルズ】に焦点を当てた深い分析記事を生成してください：
 
-            logger.info(f'検索クエリ生成: {advanced_query}')
-            return advanced_query, selected_domains
+        【重要な指示】
+        - これは価格騰落予測ではなく、業界動向・制度整備・機関参入・規制クリアに基づく分析です
+        - 後述の「歴史的マクロ文脈」と本日のニュース・トレンドを関連付けて、『なぜ今この動きが起きているのか』『背景に何があるのか』を深く説明してください
+        - 例：『XDCの取引高が増加』という日々のニュースなら、『XDC Network の ICC（国際商業会議所）との提携により、貿易金融のオンチェーン化が実現しつつあるからこそ、機関投資家が資金を流入させている』というように深い考察（Why）を記述
+        - **トップティアメディア情報の活用**: 後述のトップティアメディア（Bloomberg、CoinDesk、The Block、Messari等）から抽出したニュース・分析を参考に、記事に具体的な事例や統計数字を含める
+        - **信頼性と根拠**: 個人ブログやまとめサイトではなく、トップティアソースのスニペットを基に執筆するため、より説得力のある記事を生成してください
+"""
+
+        blocks = {
+            'trends': f"""
+        【本日のトレンドデータ】
+        {segments.get('trends', '')}
+""",
+            'scores': f"""
+        【ファンダメンタルズスコア（本日の市場データから算出）】
+        {segments.get('scores', '')}
+""",
+            'background': f"""
+        【RWA市場の長期的な背景】
+        {segments.get('background', '')}
+""",
+            'macro': f"""
+        【RWA市場の歴史的マクロ文脈】
+        {segments.get('macro', '')}
+""",
+            'news': f"""
+        【本日のトップティアメディア情報（厳選ソースのみ）】
+        以下は、{', '.join(domains[:3])} などのトップティアメディアから抽出した信頼度の高いニュース・分析です。
+        SEOスパムや低品質サイトは完全に除外しています：
+{segments.get('news', '')}
+""",
+        }
+        return prefix, blocks
+
+    def _build_article_prompt(self, trends_data: dict, inputs: dict = None,
+                              token_budget: int = None) -> tuple:
+        """
+        記事生成プロンプトを構築（ファンダメンタルズ・マクロ文脈・トップティアメディア情報）
+        戻り値: (静的プレフィックス, 実行ごとのサフィックス)。プレフィックスはコンテキストキャッシュで再利用する
+        """
+        prefix, blocks = self._build_article_context(trends_data, inputs, token_budget)
+        return prefix + """
+        【記事構成】
+        1. **冒頭** - 本日のトレンドと、その背景にあるマクロ的な文脈
+        2. **機関投資家参入の進捗** - BlackRock、Franklin Templeton などの動き（具体例を示す）
+        3. **規制フレームワークの整備状況** - SEC、金融庁、FCAなどの最新ガイダンス
+        4. **技術・インフラの進化** - スケーラビリティ、セキュリティ、相互運用性
+        5. **エコシステム提携と実需の形成** - TradFi との統合、大手機関との協業（なぜこれが重要か説明）
+        6. **長期投資家向けの視点** - 価格投機ではなく実需ベースの判断軸
+        7. **結論** - RWAセクターへの構造的な見立て
+        ※ 厳選50銘柄の分類別スナップショットは市場データから自動で差し込むため、記事には含めない
+
+        【制約】
+        - 1,800～2,200文字程度
+        - 日本語
+        - 価格予測や『煽り』表現は避け、事実ベースの分析
+        - ONDO、XDC、LINK、Chainlink、MakerDAO、Centrifuge など実在プロジェクトを具体例として含める
+        - 機関投資家・長期投資家向けの専門的かつ冷静な内容
+        - ファンダメンタルズ5軸（機関投資家参入、規制、技術、提携、市場動向）を織り込む
+        - 歴史的な背景（マクロ文脈）との関連性を示す記述を含める
+        """, ''.join(blocks.values()) + """
+        以上の本日のデータを踏まえ、記事構成に沿って記事を生成してください。
+        """
+
+    def generate_news_article(self, trends_data: dict, force_regenerate: bool = False,
+                              inputs: dict = None) -> str:
+        """
+        ファンダメンタルズ + マクロ文脈 + トップティアメディア情報ベースの RWA ニュース記事を生成
+        総時間予算（GENERATION_SLO_SECONDS）内で full → reduced → cached → default の順に試す
+        予算は入力（ニュース・マクロ文脈）の取得から数える
+        """
+        logger.info('ファンダメンタルズ + マクロ文脈 + トップティアメディア情報で記事を生成中...')
+        started = time.monotonic()
+        if inputs is None:
+            inputs = self.build_article_inputs(trends_data)
+
+        return self._generate_with_fallbacks(trends_data, inputs, [
+            ('full', lambda: self._generate_full_article(trends_data, force_regenerate, inputs),
+             REDUCED_TIER_RESERVE_SECONDS),
+        ], budget_seconds=self._remaining_budget(started))
+
+    def _generate_with_fallbacks(self, trends_data: dict, inputs: dict, timed_tiers: list,
+                                 budget_seconds: float = None) -> str:
+        """timed_tiers の後に reduced → cached → default を続けて、予算内に記事を返す"""
+        budget_seconds = GENERATION_SLO_SECONDS if budget_seconds is None else budget_seconds
+        recent_articles = self._recent_store(inputs)
+        controller = GenerationController(budget_seconds, recent_articles)
+        result = controller.run(
+            timed_tiers + [
+                ('reduced', lambda: self._generate_reduced_article(trends_data, inputs), 0),
+            ],
+            [
+                ('cached', recent_articles.load),
+                ('default', self._get_default_article),
+            ]
+        )
+        self.generation_tier = result['tier']
+        return result['text']
+
+    def _recent_store(self, inputs: dict) -> RecentArticleStore:
+        """cached 段の保存先（複数記事の生成時は記事の切り口ごとに分け、別の記事の本文を使わない）"""
+        if inputs and inputs.get('angle'):
+            return self.recent_articles.scoped(inputs['angle'])
+        return self.recent_articles
+
+    def _remaining_budget(self, started: float) -> float:
+        """started（入力の取得開始）からの経過を差し引いた総時間予算の残り秒数"""
+        return max(0.0, GENERATION_SLO_SECONDS - (time.monotonic() - started))
+
+    def _generate_full_article(self, trends_data: dict, force_regenerate: bool, inputs: dict) -> str:
+        """full 段: 通常のプロンプトで記事を生成（ARTICLE_GENERATION_MODE に従う）"""
+        if ARTICLE_GENERATION_MODE == 'sections':
+            return self._generate_sectioned_article(trends_data, force_regenerate, inputs)
+
+        prompt = self._build_article_prompt(trends_data, inputs)
+        text = self._generate_cached(prompt, force_regenerate=force_regenerate)
+        if not text:
+            return text
+        logger.info('✅ ファンダメンタルズ + マクロ文脈 + トップティアメディア情報ベース記事生成完了')
+        return insert_snapshot_section(text, self._render_snapshot_section())
+
+    def _generate_reduced_article(self, trends_data: dict, inputs: dict) -> str:
+        """reduced 段: データを縮小したプロンプトを高速モデルで生成"""
+        logger.info(f'縮小プロンプトで記事を生成中（{FAST_MODEL_NAME}）...')
+        prompt = self._build_article_prompt(trends_data, inputs, token_budget=REDUCED_PROMPT_TOKEN_BUDGET)
+        text = self._generate_cached(prompt, model_name=FAST_MODEL_NAME)
+        return insert_snapshot_section(text, self._render_snapshot_section()) if text else text
+
+    def _generate_sectioned_article(self, trends_data: dict, force_regenerate: bool = False,
+                                    inputs: dict = None) -> str:
+        """記事構成の各セクションを共通コンテキストから並列生成し、順序どおりに連結"""
+        logger.info('セクション並列で記事を生成中...')
+        context = self._build_article_context(trends_data, inputs)
+        sections = generate_sections(
+            lambda prompt, spec: self._generate_cached(
+                prompt, force_regenerate=force_regenerate, label=f"セクション [{spec['key']}] "
+            ),
+            context
+        )
 
+        if not sections:
+            logger.error('全セクションの生成に失敗しました')
+            return ''
+        logger.info(f'✅ セクション並列記事生成完了（{len(sections)} セクション）')
+        sections['projects'] = render_snapshot_body(self._latest_market_snapshot())
+        return stitch_sections(sections)
+
+    def _latest_market_snapshot(self) -> dict:
+        """今回取得したスナップショット（無ければマーケットストアの最新値）"""
+        if self.market_snapshot.get('tokens'):
+            return self.market_snapshot
+        try:
+            market_caps = self.market_store.latest('market_cap')
+            changes = self.market_store.latest('change_24h')
+            return {'tokens': {
+                symbol: {'market_cap': market_caps.get(symbol), 'change_24h': changes.get(symbol)}
+                for symbol in set(market_caps) | set(changes)
+            }}
         except Exception as e:
-            logger.warning(f'検索クエリ生成失敗: {str(e)}')
-            return None, []
+            logger.warning(f'マーケットストア読み込み失敗: {str(e)[:50]}')
+            return {}
+
+    def _render_snapshot_section(self) -> str:
+        """「主要なRWAプロジェクト群」セクションを config と最新の市場データから生成"""
+        return render_snapshot_section(self._latest_market_snapshot())
+
+    def _generate_cached(self, prompt: tuple, model_name: str = 'gemini-1.5-flash',
+                         force_regenerate: bool = False, label: str = '記事') -> str:
+        """
+        LLM キャッシュとクォータを通して Gemini でテキストを生成（空応答は保存しない）
+        prompt は (静的プレフィックス, サフィックス)。プレフィックスはコンテキストキャッシュ経由で送る
+        """
+        prefix, suffix = prompt
+        cache_key = make_key(prefix + suffix, model_name, model_settings(model_name))
+        if not (force_regenerate or FORCE_REGENERATE):
+            cached_text = self.llm_cache.get(cache_key)
+            if cached_text:
+                logger.info(f'✅ {label}キャッシュヒット（Gemini 呼び出しを省略）')
+                return cached_text
+
+        # 複数記事・セクションの並列生成時は Gemini のクォータを共有して待機
+        tokens = estimate_tokens(prefix + suffix)
+        if self.gemini_quota:
+            self.gemini_quota.acquire(tokens)
+
+        # 遅い呼び出しは p90 を過ぎたらヘッジ（2本目はクォータに空きがある場合のみ）
+        model = self.context_cache.get_model(model_name, prefix)
+        response = get_hedger(model_name).call(
+            lambda: model.generate_content(suffix),
+            allow_hedge=lambda: not self.gemini_quota or self.gemini_quota.acquire(tokens, timeout=0)
+        )
+
+        if response.text:
+            self.llm_cache.put(cache_key, response.text, model=model_name)
+        return response.text
+
+    def _build_fundamentals_context(self) -> str:
+        """config.py から RWA ファンダメンタルズコンテキストを構築（config のバージョンごとにコンパイル済み）"""
+        if not config:
+            return ""
 
-    def _search_top_tier_news(self, keyword: str) -> dict:
-        """トップティアメディアからニュースを検索"""
         try:
-            logger.info(f'トップティアメディアから検索中: {keyword}')
+            return get_compiler().fundamentals_context()
+        except Exception as e:
+            logger.warning(f'ファンダメンタルズコンテキスト構築失敗: {str(e)[:50]}')
+            return ""
 
-            # 高度な検索クエリを生成
-            search_query, selected_domains = self._generate_advanced_search_query(keyword)
+    def _format_fundamentals_scores(self, top_n: int = 5) -> str:
+        """score_fundamentals() の結果をプロンプト用のテキストに（未算出なら空文字）"""
+        scores = self.fundamentals_scores or {}
+        if not scores.get('observed_axes'):
+            return ""
+
+        top_tokens = sorted(scores['tokens'].items(), key=lambda item: item[1]['total'], reverse=True)[:top_n]
+        lines = [
+            f"算出できた軸: {', '.join(scores['observed_axes'])}（0～100、市場データを取得できた銘柄内の相対順位。他の軸は市場データからは算出しない）",
+            "上位銘柄: " + ', '.join(f"{symbol} {data['total']}" for symbol, data in top_tokens),
+        ]
+        return "\n        ".join(lines)
 
-            if not search_query:
-                logger.warning('検索クエリが生成できません')
+    def _search_top_tier_news(self, keyword: str) -> dict:
+        """トップティアメディアのニュース（フィードの新着を優先し、足りなければ TARGET_DOMAINS の全ドメインを並列検索）"""
+        try:
+            if not config or not hasattr(config, 'TARGET_DOMAINS'):
+                logger.warning('TARGET_DOMAINS が見つかりません')
                 return self._get_demo_news_data()
 
-            # Google Custom Search API または requests + BeautifulSoup で検索
-            # ここでは、デモデータを返します（実装時は実際の検索APIを使用）
-            try:
-                response = requests.get(
-                    'https://www.google.com/search',
-                    params={'q': search_query},
-                    headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    },
-                    timeout=10
-                )
+            results = []
+            if FEED_INGEST_ENABLED:
+                try:
+                    ingestor = get_ingestor()
+                    ingestor.ingest()
+                    results = ingestor.relevant_items(keyword)
+                    logger.info(f'フィードの関連記事: {len(results)} 件')
+                except Exception as e:
+                    logger.warning(f'フィード取り込み失敗: {str(e)[:50]}')
 
-                # スクレイピング結果から スニペットを抽出（簡易版）
-                # 実装上はGoogle Custom Search API推奨
-                search_results = {
-                    'query': search_query,
-                    'domains': selected_domains,
-                    'snippets': self._extract_snippets_from_search(response.text, selected_domains),
-                    'status': 'success'
-                }
+            if len(results) < FEED_MIN_RESULTS:
+                logger.info(f'トップティアメディアから検索中: {keyword}（{len(config.TARGET_DOMAINS)} ドメイン）')
+                results = dedupe_results(results + fetch_top_tier_news(keyword, config.TARGET_DOMAINS))
+            if not results:
+                logger.warning('トップティア記事を取得できません（デモデータを使用）')
+                return self._get_demo_news_data()
 
-                logger.info(f'検索完了: {len(search_results["snippets"])} 件のトップティア記事を抽出')
-                return search_results
+            search_results = {
+                'query': keyword,
+                'domains': list(dict.fromkeys(r['domain'] for r in results)),
+                'snippets': self._format_news_snippets(results),
+                'status': 'success'
+            }
 
-            except Exception as search_error:
-                logger.warning(f'Google 検索失敗: {str(search_error)[:100]}')
-                return self._get_demo_news_data()
+            logger.info(f'検索完了: {len(search_results["snippets"])} 件のトップティア記事を抽出')
+            return search_results
 
         except Exception as e:
             logger.error(f'ニュース検索失敗: {str(e)}')
             return self._get_demo_news_data()
 
-    def _extract_snippets_from_search(self, html_content: str, domains: list) -> list:
-        """検索結果から スニペットを抽出（実装は簡易版）"""
-        try:
-            # 実装例：BeautifulSoup を使用
-            # from bs4 import BeautifulSoup
-            # soup = BeautifulSoup(html_content, 'html.parser')
-            # snippets = []
-            # for snippet in soup.find_all('span', class_='st'):
-            #     text = snippet.get_text()
-            #     snippets.append(text)
-            # return snippets[:5]  # 最大5件
-
-            # ここではデモデータを返す
-            logger.info('スニペット抽出（デモモード）')
-            return self._get_demo_snippets(domains)
-
-        except Exception as e:
-            logger.warning(f'スニペット抽出失敗: {str(e)}')
-            return []
-
-    def _get_demo_snippets(self, domains: list) -> list:
-        """デモ用スニペット（実際の検索結果をシミュレート）"""
-        demo_snippets = [
-            f"{domains[0]}: RWA市場の急速な機関化により、BlackRockとFranklin Templetonが相次いで大型ファンドを設立。規制明確化によるリスク低下が背景。",
-            f"{domains[1]}: Ondo Finance のグローバル拡大により、USDY（利回り付きトークン化米国債）がAPAC地域での採用を加速。機関投資家の参入が続く。",
-            f"{domains[2]}: XDC Network、ICC（国際商業会議所）との貿易金融連携により、企業向けオンチェーン決済の実装フェーズに移行。日本の大手商社も参入検討。",
-            f"{domains[3]}: Centrifuge、機関向けプライベートクレジットプールの構築により、数十億ドル規模の企業融資がDeFiで実現可能に。",
-            f"{domains[0]}: 日本金融庁、RWAセクターの規制フレームワークを正式承認。ストラクチャー化資産のトークン化が急加速する見通し。",
+    def _format_news_snippets(self, results: list) -> list:
+        """検索結果（タイトル・スニペット）をプロンプト用の1行ずつに整形"""
+        return [
+            f"{r['domain']}: {r['title']}" + (f" — {r['snippet']}" if r['snippet'] else '')
+            for r in results
         ]
-        return demo_snippets[:min(5, len(demo_snippets))]
 
     def _get_demo_news_data(self) -> dict:
         """デモ用ニュースデータ"""
@@ -444,18 +660,18 @@ class RWANewsGenerator:
             'status': 'demo'
         }
 
-    def _build_macro_context(self) -> str:
-        """rwa_context.py から マクロ文脈を抽出し、プロンプトに組み込める形式に変換"""
+    def _build_macro_context(self, query: str = '', exclude=()) -> str:
+        """rwa_context.py から クエリに関連するマクロ文脈を抽出し、プロンプトに組み込める形式に変換"""
         if not rwa_context:
             return ""
 
-        import random
+        # BM25 インデックスで関連度上位の項目を取得（同じ入力なら毎回同じ項目）
+        return self._format_macro_context(top_macro_context(query, MACRO_CONTEXT_TOP_K, exclude=exclude))
 
-        # ランダムに10項目をサンプリング（AI の理解を助けるため）
-        sample_news = random.sample(
-            rwa_context.MACRO_CONTEXT_NEWS,
-            min(10, len(rwa_context.MACRO_CONTEXT_NEWS))
-        )
+    def _format_macro_context(self, sample_news: list) -> str:
+        """マクロ文脈の項目をプロンプトに組み込める形式に変換（項目が無ければ空文字）"""
+        if not sample_news:
+            return ""
 
         context_parts = [
             "【RWA市場の歴史的マクロ文脈 - 過去の重要ニュース・事例（参考）】",
@@ -493,7 +709,10 @@ class RWANewsGenerator:
                 'guidance_scale': 7.5
             }
 
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = get_hedger('nanobanana').call(
+                lambda: get_client().post(url, json=payload, headers=headers,
+                                          timeout=IMAGE_REQUEST_TIMEOUT, max_retries=1)
+            )
 
             if response.status_code == 200:
                 data = response.json()
@@ -759,26 +978,26 @@ RWA セクターの長期的な成長軌道は、以下の理由で堅牢です
 </p>
 """
 
-    def generate_html_page(self, article_title: str, article_content: str,
-                          image_paths: list = None, sentiment_data: dict = None) -> str:
-        """HTML ページを生成（GitHub Pages 用 + センチメント分析）"""
-        try:
-            logger.info('HTML ページを生成中...')
+    def _render_page_parts(self, article_title: str, image_paths: list = None,
+                           sentiment_data: dict = None) -> tuple:
+        """HTML ページを記事本文の前（head）と後（tail）に分けて生成"""
+        if image_paths is None:
+            image_paths = []
 
-            if image_paths is None:
-                image_paths = []
+        if sentiment_data is None:
+            sentiment_data = self._get_demo_sentiment_data()
 
-            if sentiment_data is None:
-                sentiment_data = self._get_demo_sentiment_data()
-
-            # 画像URL を保存（記事内に埋め込む）
-            image_urls_list = image_paths if image_paths else []
+        # 画像URL を記事冒頭に埋め込む
+        images_html = "\n".join(
+            f'<img class="article-image" src="{url}" alt="{article_title}">'
+            for url in image_paths if url
+        )
 
-            # センチメント分析セクション HTML を生成
-            sentiment_html = self._generate_sentiment_html(sentiment_data)
+        # センチメント分析セクション HTML を生成
+        sentiment_html = self._generate_sentiment_html(sentiment_data)
 
-            # HTML テンプレート
-            html_template = f"""<!DOCTYPE html>
+        # HTML テンプレート
+        head = f"""<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
@@ -954,7 +1173,10 @@ RWA セクターの長期的な成長軌道は、以下の理由で堅牢です
 
         <article>
             {images_html}
-            {article_content}
+"""
+
+        tail = f"""
+            {sentiment_html}
         </article>
 
         <div class="sources">
@@ -979,13 +1201,25 @@ RWA セクターの長期的な成長軌道は、以下の理由で堅牢です
 </body>
 </html>"""
 
+        return head, tail
+
+    def generate_html_page(self, article_title: str, article_content: str,
+                          image_paths: list = None, sentiment_data: dict = None) -> str:
+        """HTML ページを生成（GitHub Pages 用 + センチメント分析）"""
+        try:
+            logger.info('HTML ページを生成中...')
+
+            head, tail = self._render_page_parts(article_title, image_paths, sentiment_data)
+
             # index.html として保存
             output_dir = Path('docs')
             output_dir.mkdir(exist_ok=True)
             html_file = output_dir / 'index.html'
 
             with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(html_template)
+                f.write(head)
+                f.write(article_content)
+                f.write(tail)
 
             logger.info(f'✅ HTML ページ生成: {html_file}')
             return str(html_file)
@@ -994,86 +1228,84 @@ RWA セクターの長期的な成長軌道は、以下の理由で堅牢です
             logger.error(f'HTML 生成失敗: {str(e)}')
             return None
 
-    async def run(self):
-        """メイン処理"""
-        try:
-            logger.info('=' * 60)
-            logger.info('RWA ニュース自動公開システム開始（v4.0 - GitHub Pages）')
-            logger.info('実行時刻: ' + datetime.now().strftime('%Y-%m-%dT%H:%M:%S'))
-            logger.info('=' * 60)
-
-            # ステップ 1: トレンドデータ取得
-            trends_data = await self.fetch_trends()
-
-            # ステップ 2: 仮想資産データ取得
-            coingecko_data = await self.fetch_coingecko_data()
-
-            # ステップ 2.5: X（Twitter）センチメント分析
-            logger.info('\nX（Twitter）センチメント分析中...')
-            sentiment_data = self.fetch_twitter_sentiment()
-
-            # ステップ 3: 画像生成（Nanobanana + フォールバック）
-            logger.info('\n画像を生成中...')
-            image_urls = [
-                self.generate_nanobanana_image(
-                    'RWA institutional adoption roadmap, regulatory framework development, central bank digital currency integration, professional infographic, blue and purple gradient',
-                    'trend_analysis'
-                ),
-                self.generate_nanobanana_image(
-                    'Real World Assets ecosystem diagram, blockchain infrastructure connecting TradFi institutions, tokenization layers, technical architecture, modern design',
-                    'investment_strategy'
-                ),
-                self.generate_nanobanana_image(
-                    'Global RWA market structure, asset classes taxonomy, insurance, treasury bonds, real estate, commodities, professional financial illustration',
-                    'market_outlook'
-                )
-            ]
-
-            # ステップ 4: AI 記事生成
-            article_content = self.generate_news_article(trends_data)
+    def stream_html_page(self, trends_data: dict, article_title: str,
+                         image_paths: list = None, sentiment_data: dict = None,
+                         deadline_seconds: float = None) -> tuple:
+        """
+        Gemini のストリーミング応答を受け取りながら HTML ページを書き出す
+        締め切り（deadline_seconds と、総時間予算の残りから reduced 段の分を除いた秒数の短い方）を
+        超えた場合はそれまでの本文で公開する。本文が1文字も届かなければ
+        残りの生成予算で reduced → cached → default の順に切り替える。戻り値: (HTML パス, 記事本文)
+        """
+        deadline_seconds = STREAM_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+        html_file = Path('docs') / 'index.html'
+        started = time.monotonic()
+        inputs = None
 
-            if not article_content:
-                logger.error('記事生成に失敗しました')
-                return False
-
-            # ステップ 5: HTML ページ生成（画像3枚埋め込み + センチメント分析）
-            article_title = 'RWA市場の機関化と規制フレームワーク整備状況'
-            html_file = self.generate_html_page(
-                article_title,
-                article_content,
-                image_urls,
-                sentiment_data
-            )
+        try:
+            logger.info('ストリーミングで記事を生成中...')
+            head, tail = self._render_page_parts(article_title, image_paths, sentiment_data)
+            inputs = self.build_article_inputs(trends_data)
+            prefix, suffix = self._build_article_prompt(trends_data, inputs)
+
+            model_name = 'gemini-1.5-flash'
+            cache_key = make_key(prefix + suffix, model_name, model_settings(model_name))
+            cached_text = None if FORCE_REGENERATE else self.llm_cache.get(cache_key)
+            snapshot_section = self._render_snapshot_section()
+            if cached_text:
+                logger.info('✅ 記事キャッシュヒット（Gemini 呼び出しを省略）')
+                cached_text = insert_snapshot_section(cached_text, snapshot_section)
+                return self.generate_html_page(article_title, cached_text, image_paths, sentiment_data), cached_text
+
+            # full 段（ストリーミング）も他の段と同じく、総時間予算の残りから後続の段の分を除いた秒数で打ち切る
+            stream_seconds = min(deadline_seconds, self._remaining_budget(started) - REDUCED_TIER_RESERVE_SECONDS)
+            if stream_seconds <= 0:
+                logger.warning('生成予算の残りがないため、ストリーミング生成を省略します')
+                article_text = self._stream_fallback_article(trends_data, inputs, started)
+                return self.generate_html_page(article_title, article_text, image_paths, sentiment_data), article_text
+
+            deadline = time.monotonic() + stream_seconds
+            model = self.context_cache.get_model(model_name, prefix)
+
+            def _open_stream():
+                # クォータ待ち・リクエスト送信・最初のチャンク待ちも締め切りの対象にする
+                if self.gemini_quota:
+                    self.gemini_quota.acquire(self.gemini_quota.estimate_tokens(prefix + suffix))
+                return model.generate_content(suffix, stream=True)
+
+            with StreamingPageWriter(html_file, head, tail, insert=(SNAPSHOT_ANCHOR, snapshot_section)) as writer:
+                for chunk in iter_with_deadline(_open_stream, deadline):
+                    writer.write(chunk.text)
+
+            article_text = writer.article_text
+            if not article_text:
+                logger.error('AI 応答が空です')
+                article_text = self._stream_fallback_article(trends_data, inputs, started)
+                return self.generate_html_page(article_title, article_text, image_paths, sentiment_data), article_text
 
-            if html_file:
-                logger.info('\n' + '=' * 60)
-                logger.info('✅ HTML ページ生成成功！')
-                logger.info('=' * 60)
-                logger.info(f'ファイル: {html_file}')
-                logger.info('\n📡 GitHub Pages に自動デプロイされます')
-                return True
+            if writer.truncated:
+                logger.warning(f'締め切り（{stream_seconds:.0f}秒）で打ち切り: {len(article_text)} 文字を公開')
             else:
-                logger.error('HTML 生成失敗')
-                return False
+                self.llm_cache.put(cache_key, article_text, model=model_name)
+                self._recent_store(inputs).save(insert_snapshot_section(article_text, snapshot_section), 'full')
+                logger.info(f'✅ ストリーミング記事生成完了: {len(article_text)} 文字')
+
+            self.generation_tier = 'full'
+            GenerationController(GENERATION_SLO_SECONDS, self._recent_store(inputs)).record({
+                'text': article_text, 'tier': 'full', 'truncated': writer.truncated,
+                'elapsed': round(time.monotonic() - started, 2), 'errors': {},
+            })
+            logger.info(f'✅ HTML ページ生成: {html_file}')
+            return str(html_file), article_text
 
         except Exception as e:
-            logger.error(f'エラー: {str(e)}')
-            import traceback
-            traceback.print_exc()
-            return False
+            logger.error(f'ストリーミング記事生成失敗: {str(e)}')
+            article_text = self._stream_fallback_article(trends_data, inputs, started)
+            return self.generate_html_page(article_title, article_text, image_paths, sentiment_data), article_text
 
-
-async def main():
-    """エントリーポイント"""
-    generator = RWANewsGenerator()
-    success = await generator.run()
-    return success
-
-
-if __name__ == '__main__':
-    import asyncio
-    success = asyncio.run(main())
-    exit(0 if success else 1)
+    def _stream_fallback_article(self, trends_data: dict, inputs: dict, started: float) -> str:
+        """ストリーミング失敗時、総予算の残りで reduced 段以降を試す"""
+        return self._generate_with_fallbacks(trends_data, inputs, [], budget_seconds=self._remaining_budget(started))
 
     def _generate_sentiment_html(self, sentiment_data: dict) -> str:
         """センチメント分析結果を HTML で生成"""
@@ -1120,3 +1352,180 @@ if __name__ == '__main__':
 
         except Exception as e:
             return ""
+
+    def score_fundamentals(self, market_snapshot: dict) -> dict:
+        """マーケットスナップショットから銘柄別・軸別のファンダメンタルズスコアを計算"""
+        if not FundamentalsScorer or not config:
+            return {}
+
+        try:
+            scorer = FundamentalsScorer()
+            signals = scorer.market_signals(market_snapshot)
+            # 市場データから値が得られた指標・軸だけでスコアを出す
+            scores = scorer.score(scorer.build_matrix(signals), scorer.observed_indicators(signals))
+
+            top_tokens = sorted(scores['tokens'].items(), key=lambda item: item[1]['total'], reverse=True)[:5]
+            logger.info('ファンダメンタルズスコア上位: ' + ', '.join(
+                f"{symbol} {data['total']}" for symbol, data in top_tokens
+            ))
+            return scores
+
+        except Exception as e:
+            logger.warning(f'ファンダメンタルズスコアリング失敗: {str(e)[:50]}')
+            return {}
+
+    async def _run_source(self, name: str, semaphore: asyncio.Semaphore,
+                          func, *args, fallback=None):
+        """
+        1つのデータソースを同時実行数の制限とタイムアウト付きで実行
+        ソースはデーモンスレッドで実行し、タイムアウト後も処理が終わるまで同時実行枠を返さない
+        （打ち切ったソースがプロセスの終了を待たせることもない）
+        """
+        timeout = SOURCE_TIMEOUTS.get(name.split(':')[0], 30)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def _settle(result, error):
+            semaphore.release()
+            if not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+        def _worker():
+            result, error = None, None
+            try:
+                result = func(*args)
+            except Exception as e:
+                error = e
+            try:
+                loop.call_soon_threadsafe(_settle, result, error)
+            except RuntimeError:
+                pass  # イベントループ終了後に終わったソース
+
+        await semaphore.acquire()
+        threading.Thread(target=_worker, name=f'source-{name}', daemon=True).start()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f'{name}: {timeout}秒でタイムアウトしました。フォールバックを使用します')
+        except Exception as e:
+            logger.warning(f'{name}: 取得失敗 - {str(e)[:50]}')
+        return fallback() if fallback else None
+
+    async def acquire_inputs(self) -> dict:
+        """独立した外部データ取得を並行実行（実行時間は最も遅いソースで決まる）"""
+        logger.info(f'データ取得ステージ開始（同時実行数: {ACQUISITION_CONCURRENCY}）')
+        semaphore = asyncio.Semaphore(max(1, ACQUISITION_CONCURRENCY))
+        started = datetime.now()
+
+        tasks = [
+            self._run_source('trends', semaphore, self._fetch_trends_sync,
+                             fallback=lambda: {kw: 0 for kw in RWA_KEYWORDS}),
+            self._run_source('coingecko', semaphore, self._fetch_coingecko_data_sync,
+                             fallback=dict),
+            self._run_source('sentiment', semaphore, self.fetch_twitter_sentiment,
+                             fallback=self._get_demo_sentiment_data),
+        ]
+        for image_type, image_prompt in IMAGE_PROMPTS:
+            tasks.append(self._run_source(
+                f'image:{image_type}', semaphore, self.generate_nanobanana_image,
+                image_prompt, image_type,
+                fallback=lambda t=image_type: self._get_fallback_image_url(t)
+            ))
+
+        results = await asyncio.gather(*tasks)
+        elapsed = (datetime.now() - started).total_seconds()
+        logger.info(f'✅ データ取得ステージ完了（{elapsed:.1f}秒）')
+
+        return {
+            'trends': results[0],
+            'coingecko': results[1],
+            'sentiment': results[2],
+            'images': list(results[3:]),
+        }
+
+    async def run(self):
+        """メイン処理"""
+        try:
+            logger.info('=' * 60)
+            logger.info('RWA ニュース自動公開システム開始（v4.0 - GitHub Pages）')
+            logger.info('実行時刻: ' + datetime.now().strftime('%Y-%m-%dT%H:%M:%S'))
+            logger.info('=' * 60)
+
+            # ステップ 1～3: データ取得（トレンド・CoinGecko・センチメント・画像を並行取得）
+            acquired = await self.acquire_inputs()
+            trends_data = acquired['trends']
+            coingecko_data = acquired['coingecko']
+            sentiment_data = acquired['sentiment']
+            image_urls = acquired['images']
+
+            # ステップ 3.5: マーケットスナップショットを履歴ストアに追記
+            try:
+                self.market_store.append_snapshot(coingecko_data)
+            except Exception as e:
+                logger.warning(f'マーケットストア追記失敗: {str(e)[:50]}')
+
+            self.market_snapshot = coingecko_data or {}
+
+            # ステップ 3.6: ファンダメンタルズスコアリング
+            self.fundamentals_scores = self.score_fundamentals(coingecko_data)
+
+            article_title = 'RWA市場の機関化と規制フレームワーク整備状況'
+
+            if ARTICLE_STREAMING and ARTICLE_GENERATION_MODE != 'sections':
+                # ステップ 4-5: AI 記事をストリーミング生成しながら HTML ページへ書き出し
+                html_file, article_content = self.stream_html_page(
+                    trends_data,
+                    article_title,
+                    image_urls,
+                    sentiment_data
+                )
+            else:
+                # ステップ 4: AI 記事生成
+                article_content = self.generate_news_article(trends_data)
+
+                if not article_content:
+                    logger.error('記事生成に失敗しました')
+                    return False
+
+                # ステップ 5: HTML ページ生成（画像3枚埋め込み + センチメント分析）
+                html_file = self.generate_html_page(
+                    article_title,
+                    article_content,
+                    image_urls,
+                    sentiment_data
+                )
+
+            if html_file:
+                logger.info('\n' + '=' * 60)
+                logger.info('✅ HTML ページ生成成功！')
+                logger.info('=' * 60)
+                logger.info(f'ファイル: {html_file}')
+                logger.info('\n📡 GitHub Pages に自動デプロイされます')
+                return True
+            else:
+                logger.error('HTML 生成失敗')
+                return False
+
+        except Exception as e:
+            logger.error(f'エラー: {str(e)}')
+            import traceback
+            traceback.print_exc()
+            return False
+
+
+async def main():
+    """エントリーポイント"""
+    generator = RWANewsGenerator()
+    success = await generator.run()
+
+    # バックグラウンドでのトレンドキャッシュ更新を書き込み完了まで待つ
+    generator.trends_cache.wait_for_refresh(timeout=60)
+    return success
+
+
+if __name__ == '__main__':
+    success = asyncio.run(main())
+    exit(0 if success else 1)
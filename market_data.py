@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RWA 厳選50銘柄のマーケットデータ取得モジュール
+config.RWA_TOKENS からシンボル → CoinGecko ID のインデックスを構築し、
+/coins/markets のバッチ取得（1ページ最大250銘柄）で全銘柄を一括取得する
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from http_client import get_client
+
+try:
+    import config
+except ImportError:
+    config = None
+
+logger = logging.getLogger(__name__)
+
+COINGECKO_API = 'https://api.coingecko.com/api/v3'
+
+# /coins/markets の1ページあたりの最大件数
+MARKETS_PER_PAGE = 250
+
+INDEX_CACHE_PATH = Path(os.getenv('COINGECKO_INDEX_PATH', '.cache/coingecko_index.json'))
+
+# シンボルだけでは一意に決まらない銘柄の CoinGecko ID
+KNOWN_COINGECKO_IDS = {
+    'XDC': 'xdce-crowd-sale',
+    'OM': 'mantra-dao',
+    'POLYX': 'polymesh',
+    'LINK': 'chainlink',
+    'QNT': 'quant-network',
+    'AVAX': 'avalanche-2',
+    'DUSK': 'dusk-network',
+    'LTO': 'lto-network',
+    'CTC': 'creditcoin-2',
+    'ONDO': 'ondo-finance',
+    'CFG': 'centrifuge',
+    'IXS': 'ix-swap',
+    'MPL': 'maple',
+    'GFI': 'goldfinch',
+    'TRU': 'truefi',
+    'CPOOL': 'clearpool',
+    'HIFI': 'hifi-finance',
+    'NAOS': 'naos-finance',
+    'BOSON': 'boson-protocol',
+    'OPUL': 'opulous',
+    'MKR': 'maker',
+    'PAXG': 'pax-gold',
+    'XAUT': 'tether-gold',
+    'KLIMA': 'klima-dao',
+    'MCO2': 'moss-carbon-credit',
+    'PENDLE': 'pendle',
+    'SNX': 'havven',
+    'DIMO': 'dimo',
+}
+
+
+def iter_universe():
+    """config.RWA_TOKENS の (カテゴリ, トークン情報) を順に返す"""
+    if not config:
+        return
+    for category, tokens in config.RWA_TOKENS.items():
+        for token in tokens:
+            yield category, token
+
+
+def _universe_hash() -> str:
+    """銘柄ユニバース（シンボル・名前）のハッシュ。config 変更時にインデックスを作り直す"""
+    universe = [[category, t['symbol'], t['name']] for category, t in iter_universe()]
+    payload = json.dumps([universe, KNOWN_COINGECKO_IDS], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _resolve_ids(coins_list: list) -> dict:
+    """/coins/list の結果からシンボル → ID を解決（名前一致を優先、候補が1件のみなら採用）"""
+    by_symbol = {}
+    for coin in coins_list:
+        by_symbol.setdefault(coin.get('symbol', '').upper(), []).append(coin)
+
+    resolved = {}
+    for category, token in iter_universe():
+        symbol = token['symbol']
+        if symbol in KNOWN_COINGECKO_IDS:
+            resolved[symbol] = KNOWN_COINGECKO_IDS[symbol]
+            continue
+
+        candidates = by_symbol.get(symbol, [])
+        named = [c for c in candidates if c.get('name', '').lower() == token['name'].lower()]
+        if named:
+            resolved[symbol] = named[0]['id']
+        elif len(candidates) == 1:
+            resolved[symbol] = candidates[0]['id']
+        else:
+            logger.warning(f'{symbol}: CoinGecko ID を一意に特定できません（候補 {len(candidates)} 件）')
+
+    return resolved
+
+
+def load_symbol_index(client=None) -> dict:
+    """シンボル → CoinGecko ID のインデックスを取得（config が変わらない限りディスクから再利用）"""
+    universe_hash = _universe_hash()
+    try:
+        with open(INDEX_CACHE_PATH, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('universe_hash') == universe_hash:
+            return cached['ids']
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f'CoinGecko インデックス読み込み失敗: {str(e)[:50]}')
+
+    client = client or get_client()
+    unknown = [t['symbol'] for _, t in iter_universe() if t['symbol'] not in KNOWN_COINGECKO_IDS]
+    coins_list = []
+    if unknown:
+        logger.info(f'CoinGecko ID を解決中: {len(unknown)} 銘柄')
+        response = client.get(f'{COINGECKO_API}/coins/list')
+        if response.status_code == 200:
+            coins_list = response.json()
+        else:
+            logger.warning(f'CoinGecko /coins/list エラー: {response.status_code}')
+
+    ids = _resolve_ids(coins_list)
+
+    # /coins/list が取得できなかった場合は次回再解決できるよう保存しない
+    if coins_list or not unknown:
+        try:
+            INDEX_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(INDEX_CACHE_PATH, 'w', encoding='utf-8') as f:
+                json.dump({'universe_hash': universe_hash, 'ids': ids}, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f'CoinGecko インデックス保存失敗: {str(e)[:50]}')
+
+    return ids
+
+
+def _build_snapshot(markets: list, symbol_index: dict, vs_currency: str) -> dict:
+    """/coins/markets の結果をシンボル別・カテゴリ別のスナップショットに整形"""
+    by_id = {m['id']: m for m in markets}
+    tokens = {}
+    categories = {}
+    missing = []
+
+    for category, token in iter_universe():
+        symbol = token['symbol']
+        market = by_id.get(symbol_index.get(symbol))
+        summary = categories.setdefault(category, {
+            'symbols': [], 'market_cap': 0.0, 'volume': 0.0, 'change_24h': None
+        })
+        summary['symbols'].append(symbol)
+
+        if not market:
+            missing.append(symbol)
+            continue
+
+        tokens[symbol] = {
+            'id': market['id'],
+            'name': token['name'],
+            'category': category,
+            'price': market.get('current_price'),
+            'market_cap': market.get('market_cap'),
+            'volume': market.get('total_volume'),
+            'change_24h': market.get('price_change_percentage_24h'),
+        }
+
+    # カテゴリ集計（24h 変化率は時価総額加重平均）
+    for category, summary in categories.items():
+        members = [tokens[s] for s in summary['symbols'] if s in tokens]
+        summary['market_cap'] = sum(t['market_cap'] or 0 for t in members)
+        summary['volume'] = sum(t['volume'] or 0 for t in members)
+        weighted = [(t['market_cap'] or 0, t['change_24h']) for t in members if t['change_24h'] is not None]
+        total_weight = sum(w for w, _ in weighted)
+        if total_weight > 0:
+            summary['change_24h'] = sum(w * c for w, c in weighted) / total_weight
+
+    return {
+        'fetched_at': datetime.now().isoformat(),
+        'vs_currency': vs_currency,
+        'tokens': tokens,
+        'categories': categories,
+        'missing': missing,
+    }
+
+
+def fetch_market_snapshot(vs_currency: str = 'usd', client=None) -> dict:
+    """厳選50銘柄の価格・時価総額・出来高・24h変化率を最小回数のバッチ取得で取得"""
+    client = client or get_client()
+    symbol_index = load_symbol_index(client)
+    ids = sorted(set(symbol_index.values()))
+
+    markets = []
+    for page_start in range(0, len(ids), MARKETS_PER_PAGE):
+        page_ids = ids[page_start:page_start + MARKETS_PER_PAGE]
+        response = client.get(
+            f'{COINGECKO_API}/coins/markets',
+            params={
+                'vs_currency': vs_currency,
+                'ids': ','.join(page_ids),
+                'per_page': MARKETS_PER_PAGE,
+                'page': 1,
+                'price_change_percentage': '24h',
+            }
+        )
+        if response.status_code != 200:
+            logger.warning(f'CoinGecko /coins/markets エラー: {response.status_code}')
+            continue
+        markets.extend(response.json())
+
+    snapshot = _build_snapshot(markets, symbol_index, vs_currency)
+    logger.info(f'マーケットデータ取得: {len(snapshot["tokens"])} 銘柄（未取得 {len(snapshot["missing"])}）')
+    return snapshot
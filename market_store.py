@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+マーケットスナップショットの追記専用・カラム指向ストア
+実行ごとの (時刻, 銘柄) 行を固定長 float64 / int32 のカラムファイルに追記し、
+mmap で読み込んで 7日/30日の変化率やランキングを API 呼び出しなしで計算する
+
+レイアウト（root 配下）:
+  meta.json       銘柄一覧（列番号の対応）とコミット済み行数
+  ts.f64          行ごとの取得時刻（UNIX 秒）
+  sym.i32         行ごとの銘柄番号
+  price.f64 / market_cap.f64 / volume.f64 / change_24h.f64
+"""
+
+import os
+import json
+import mmap
+import math
+import time
+import logging
+import threading
+from array import array
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# バイナリのカラムファイルは git にコミットしない .cache/ に置く（CI では actions/cache で実行間に引き継ぐ）
+DEFAULT_STORE_DIR = Path(os.getenv('MARKET_STORE_DIR', '.cache/market_store'))
+# 以前の保存先（output/ はワークフローがコミットするため移動する）
+LEGACY_STORE_DIR = Path('output/market_store')
+
+FIELDS = ('price', 'market_cap', 'volume', 'change_24h')
+
+# カラム名 → array の型コード（固定長）
+COLUMNS = {'ts': 'd', 'sym': 'i', **{field: 'd' for field in FIELDS}}
+
+DAY = 86400
+
+
+def _to_float(value) -> float:
+    return float(value) if value is not None else math.nan
+
+
+class MarketStore:
+    """追記専用のマーケットスナップショットストア"""
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._meta = None
+        if self.root == DEFAULT_STORE_DIR and not self.root.exists() and LEGACY_STORE_DIR.is_dir():
+            self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """以前の保存先の履歴を引き継ぐ（7日/30日比較の履歴を失わないため）"""
+        try:
+            self.root.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(LEGACY_STORE_DIR, self.root)
+            logger.info(f'マーケットストアを移動: {LEGACY_STORE_DIR} → {self.root}')
+        except Exception as e:
+            logger.warning(f'マーケットストアの移動失敗: {str(e)[:50]}')
+
+    def _column_path(self, name: str) -> Path:
+        ext = 'i32' if COLUMNS[name] == 'i' else 'f64'
+        return self.root / f'{name}.{ext}'
+
+    def _load_meta(self) -> dict:
+        if self._meta is None:
+            try:
+                with open(self.root / 'meta.json', 'r', encoding='utf-8') as f:
+                    self._meta = json.load(f)
+            except FileNotFoundError:
+                self._meta = {'symbols': [], 'rows': 0}
+        return self._meta
+
+    def _save_meta(self):
+        tmp_path = self.root / 'meta.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.root / 'meta.json')
+
+    @property
+    def symbols(self) -> list:
+        return list(self._load_meta()['symbols'])
+
+    def __len__(self) -> int:
+        return self._load_meta()['rows']
+
+    def append_snapshot(self, snapshot: dict, timestamp: float = None) -> int:
+        """market_data のスナップショットを1回分追記し、追記した行数を返す"""
+        tokens = (snapshot or {}).get('tokens') or {}
+        if not tokens:
+            return 0
+
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            meta = self._load_meta()
+            symbol_ids = {symbol: i for i, symbol in enumerate(meta['symbols'])}
+
+            columns = {name: array(code) for name, code in COLUMNS.items()}
+            for symbol, data in tokens.items():
+                if symbol not in symbol_ids:
+                    symbol_ids[symbol] = len(meta['symbols'])
+                    meta['symbols'].append(symbol)
+                columns['ts'].append(timestamp)
+                columns['sym'].append(symbol_ids[symbol])
+                for field in FIELDS:
+                    columns[field].append(_to_float(data.get(field)))
+
+            # 前回中断された書き込みの残骸（コミット済み行数を超える部分）を切り詰めてから追記
+            committed = meta['rows']
+            for name, values in columns.items():
+                path = self._column_path(name)
+                with open(path, 'ab') as f:
+                    f.truncate(committed * values.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    values.tofile(f)
+
+            meta['rows'] = committed + len(tokens)
+            self._save_meta()
+
+        logger.info(f'マーケットストアに追記: {len(tokens)} 銘柄（累計 {meta["rows"]} 行）')
+        return len(tokens)
+
+    def _read_column(self, name: str) -> array:
+        """コミット済み行数分のカラムを mmap 経由で読み込む"""
+        rows = len(self)
+        values = array(COLUMNS[name])
+        path = self._column_path(name)
+        if rows == 0 or not path.exists():
+            return values
+
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                values.frombytes(mapped[:rows * values.itemsize])
+        return values
+
+    def series(self, symbol: str, field: str = 'price') -> list:
+        """銘柄の (時刻, 値) 時系列"""
+        symbols = self._load_meta()['symbols']
+        if symbol not in symbols:
+            return []
+        symbol_id = symbols.index(symbol)
+        ts, sym, values = self._read_column('ts'), self._read_column('sym'), self._read_column(field)
+        return [(ts[i], values[i]) for i in range(len(sym)) if sym[i] == symbol_id]
+
+    def _values_at(self, field: str, at: float = None) -> dict:
+        """各銘柄について、時刻 at 以前で最新の値（at=None なら最新値）"""
+        symbols = self._load_meta()['symbols']
+        ts, sym, values = self._read_column('ts'), self._read_column('sym'), self._read_column(field)
+        result = {}
+        for i in range(len(sym)):
+            if at is not None and ts[i] > at:
+                continue
+            if not math.isnan(values[i]):
+                result[symbols[sym[i]]] = (ts[i], values[i])
+        return result
+
+    def latest(self, field: str = 'price') -> dict:
+        """銘柄ごとの最新値"""
+        return {symbol: value for symbol, (_, value) in self._values_at(field).items()}
+
+    def delta(self, field: str = 'price', days: int = 7) -> dict:
+        """銘柄ごとの N 日間の変化率（%）。N 日前のデータが無い銘柄は含めない"""
+        current = self._values_at(field)
+        if not current:
+            return {}
+        newest = max(ts for ts, _ in current.values())
+        past = self._values_at(field, at=newest - days * DAY)
+
+        deltas = {}
+        for symbol, (_, value) in current.items():
+            if symbol in past and past[symbol][1]:
+                deltas[symbol] = (value - past[symbol][1]) / past[symbol][1] * 100
+        return deltas
+
+    def ranking(self, field: str = 'price', days: int = 7, top: int = 10) -> list:
+        """N 日間の変化率上位の (銘柄, 変化率) リスト"""
+        deltas = self.delta(field, days)
+        return sorted(deltas.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    store = MarketStore()
+    print(f"銘柄数: {len(store.symbols)} / 行数: {len(store)}")
+    for symbol, change in store.ranking(days=7, top=5):
+        print(f"  {symbol}: {change:+.2f}%")
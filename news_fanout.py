@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+トップティアメディアのドメイン別ニュース取得（並列ファンアウト）
+config.TARGET_DOMAINS の全ドメインをドメインごとのソースに分けて同時に問い合わせ、
+結果を1つのランキングにまとめて正規化 URL で重複を除く
+
+- 同じホストへの同時リクエストは FANOUT_PER_HOST_LIMIT 本まで（ドメイン別の site: 検索は同じ検索ホストに集まる）
+- 全体の待ち時間は FANOUT_DEADLINE_SECONDS まで。間に合わなかったドメインは今回の結果から外す
+- 検索はリトライせず、429・/sorry/ への転送を1回受けたら同じ実行の残りの検索は送らない
+- ランキングはドメイン内の順位 → TARGET_DOMAINS の並び順（各ドメインの上位記事が先に並ぶ）
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from http_client import get_client
+from search_parser import parse_search_results
+
+logger = logging.getLogger(__name__)
+
+FANOUT_WORKERS = int(os.getenv('FANOUT_WORKERS', '16'))
+FANOUT_PER_HOST_LIMIT = int(os.getenv('FANOUT_PER_HOST_LIMIT', '4'))
+FANOUT_DEADLINE_SECONDS = float(os.getenv('FANOUT_DEADLINE_SECONDS', '20'))
+# ドメインごとに取る記事数と、マージ後に残す記事数
+FANOUT_PER_DOMAIN = int(os.getenv('FANOUT_PER_DOMAIN', '3'))
+FANOUT_MAX_RESULTS = int(os.getenv('FANOUT_MAX_RESULTS', '8'))
+
+SEARCH_URL = 'https://www.google.com/search'
+SEARCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# 正規化で取り除くクエリパラメータ（計測・流入元の識別用）
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src',
+    'cmpid', 'smid', 'mod', 'guccounter', 'guce_referrer', 'sa', 'ved', 'usg', 'amp',
+}
+
+
+def canonical_url(url: str) -> str:
+    """重複判定用の正規化 URL（スキーム・www・計測パラメータ・フラグメント・末尾スラッシュの違いを無視）"""
+    parts = urlsplit((url or '').strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    path = parts.path.rstrip('/')
+    if path.endswith('/amp'):
+        path = path[:-4]
+    return urlunsplit(('https', host, path or '/', urlencode(query), ''))
+
+
+class SearchBlocked(Exception):
+    """検索ホストにブロック（429・/sorry/ への転送）された、または同じ実行で既にブロックされている"""
+
+
+def _is_blocked(response) -> bool:
+    """検索ホストのレート制限・ボット判定ページか判定"""
+    if response.status_code == 429:
+        return True
+    location = f"{getattr(response, 'url', '')} {response.headers.get('Location', '')}"
+    return '/sorry/' in location
+
+
+class SearchSource:
+    """1ドメイン分のニュースソース（site: 検索の結果ページを search_parser で解析）"""
+
+    def __init__(self, domain: str, per_domain: int = FANOUT_PER_DOMAIN, blocked: threading.Event = None):
+        self.domain = domain
+        self.per_domain = per_domain
+        self.host = urlsplit(SEARCH_URL).hostname
+        # 同じ実行の検索ソースで共有（1件でもブロックされたら残りは送らない）
+        self.blocked = blocked or threading.Event()
+
+    def fetch(self, keyword: str) -> list:
+        if self.blocked.is_set():
+            raise SearchBlocked('検索ホストにブロックされたため中止')
+        # ブロック時に再試行でリクエストを重ねないよう、リトライはしない
+        response = get_client().get(
+            SEARCH_URL,
+            params={'q': f'"{keyword}" RWA site:{self.domain}'},
+            headers=SEARCH_HEADERS,
+            max_retries=0,
+        )
+        if _is_blocked(response):
+            if not self.blocked.is_set():
+                self.blocked.set()
+                logger.warning(f'検索ホストにブロックされました（ステータス {response.status_code}）。残りの検索を中止します')
+            raise SearchBlocked(f'ステータス {response.status_code}')
+        return parse_search_results(response.text, [self.domain], self.per_domain)
+
+
+def search_sources(domains: list, per_domain: int = FANOUT_PER_DOMAIN) -> list:
+    """ドメインごとの site: 検索ソース（ブロック検知のフラグを共有）"""
+    blocked = threading.Event()
+    return [SearchSource(domain, per_domain, blocked) for domain in domains]
+
+
+def fan_out(sources: list, keyword: str, max_workers: int = FANOUT_WORKERS,
+            per_host_limit: int = FANOUT_PER_HOST_LIMIT,
+            deadline_seconds: float = FANOUT_DEADLINE_SECONDS) -> dict:
+    """
+    全ソースを並列に問い合わせ、{ドメイン: [結果, ...]} を返す
+    失敗したソース・期限までに返らなかったソースは含めない
+    """
+    if not sources:
+        return {}
+
+    host_slots = {}
+    for source in sources:
+        host_slots.setdefault(source.host, threading.BoundedSemaphore(max(1, per_host_limit)))
+
+    def _run(source):
+        with host_slots[source.host]:
+            return source.fetch(keyword)
+
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources))),
+                                  thread_name_prefix='news-fanout')
+    futures = {executor.submit(_run, source): source for source in sources}
+    done, pending = wait(futures, timeout=deadline_seconds)
+    # 期限切れのソースは待たない（実行中のリクエストは HTTP タイムアウトで終わる）
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    skipped = []
+    for future in done:
+        source = futures[future]
+        try:
+            results[source.domain] = future.result()
+        except SearchBlocked:
+            skipped.append(source.domain)
+        except Exception as e:
+            logger.warning(f'ニュース取得失敗 [{source.domain}]: {str(e)[:50]}')
+    if skipped:
+        logger.warning(f'検索ホストのブロックにより取得しなかったソース: {len(skipped)} 件')
+    if pending:
+        late = ', '.join(sorted(futures[f].domain for f in pending))
+        logger.warning(f'期限（{deadline_seconds:.0f}秒）までに返らなかったソース: {late}')
+
+    hits = sum(len(items) for items in results.values())
+    logger.info(
+        f'ニュース ファンアウト完了: {len(results)}/{len(sources)} ソース・{hits} 件'
+        f'（{time.monotonic() - started:.1f}秒）'
+    )
+    return results
+
+
+def merge_results(results: dict, domain_order: list, max_results: int = FANOUT_MAX_RESULTS) -> list:
+    """
+    ドメイン別の結果を1つのランキングにまとめ、正規化 URL の重複を除いて上位 max_results 件を返す
+    各結果には canonical_url を付ける
+    """
+    priority = {domain: i for i, domain in enumerate(domain_order)}
+    ranked = sorted(
+        ((position, priority.get(domain, len(priority)), item)
+         for domain, items in results.items()
+         for position, item in enumerate(items)),
+        key=lambda entry: entry[:2]
+    )
+    return dedupe_results([item for _, _, item in ranked], max_results)
+
+
+def dedupe_results(items: list, max_results: int = FANOUT_MAX_RESULTS) -> list:
+    """ランキング順の結果から正規化 URL の重複を除き（先に現れた方を残す）、canonical_url を付けて上位 max_results 件を返す"""
+    merged, seen = [], set()
+    for item in items:
+        key = canonical_url(item['url'])
+        if key in seen:
+            continue
+        seen.add(key)
+        merged.append({**item, 'canonical_url': key})
+        if len(merged) >= max_results:
+            break
+    return merged
+
+
+def fetch_top_tier_news(keyword: str, domains: list, max_results: int = FANOUT_MAX_RESULTS) -> list:
+    """全対象ドメインを並列に検索し、マージ・重複除去した上位記事を返す"""
+    return merge_results(fan_out(search_sources(domains), keyword), domains, max_results)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+記事生成プロンプトのトークン予算管理
+プロンプトをセグメント（トレンド・ファンダメンタルズ・マクロ文脈・ニュース等）単位で数え、
+重複する事実を除き、JSON を詰めて、予算を超えた分は優先度の低いセグメントから削る
+
+- トークン数は Gemini のトークナイザを呼ばない概算（ASCII 約4文字で1トークン、日本語はほぼ1文字1トークン）
+- 削る単位は行（末尾から）。見出し行しか残らないセグメントは丸ごと除外
+- required=True のセグメントは削らない
+- 実行ごとのトークン数を output/prompt_metrics.jsonl に1行ずつ記録
+"""
+
+import os
+import re
+import json
+import logging
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '6000'))
+PROMPT_METRICS_PATH = Path(os.getenv('PROMPT_METRICS_PATH', 'output/prompt_metrics.jsonl'))
+
+# 重複判定で無視する行頭の記号・番号（"  - ", "3. ", "・" など）
+_BULLET = re.compile(r'^[\s\-・*●]*(\d+[.)．]\s*)?')
+_MIN_FACT_CHARS = 8
+
+
+def estimate_tokens(text: str) -> int:
+    """トークン数の概算（ASCII は約4文字で1トークン、日本語などはほぼ1文字1トークン）"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+def compact_json(data) -> str:
+    """インデント・区切りの空白を除いた JSON"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def _fact_key(line: str) -> str:
+    """重複判定用に行を正規化（見出し・短すぎる行は対象外で空文字）"""
+    text = unicodedata.normalize('NFKC', line).strip()
+    if not text or text.startswith('【'):
+        return ''
+    text = _BULLET.sub('', text).strip().lower()
+    return text if len(text) >= _MIN_FACT_CHARS else ''
+
+
+def _is_heading(line: str) -> bool:
+    return not line.strip() or line.strip().startswith('【')
+
+
+def _strip_trailing_headings(lines: list):
+    """末尾に残った見出し・空行を取り除く（本文のない見出しを残さない）"""
+    while lines and _is_heading(lines[-1]):
+        lines.pop()
+
+
+def _is_heading_only(lines: list) -> bool:
+    return all(_is_heading(line) for line in lines)
+
+
+class PromptBudgeter:
+    """プロンプトのセグメントをトークン予算内に収める"""
+
+    def __init__(self, budget: int = PROMPT_TOKEN_BUDGET):
+        self.budget = budget
+        self.segments = []
+
+    def add(self, name: str, text: str, priority: int, required: bool = False):
+        """セグメントを追加（priority が大きいほど残す）"""
+        self.segments.append({
+            'name': name,
+            'lines': (text or '').split('\n'),
+            'priority': priority,
+            'required': required,
+            'tokens_in': estimate_tokens(text or ''),
+        })
+        return self
+
+    def _tokens(self, segment: dict) -> int:
+        return estimate_tokens('\n'.join(segment['lines']))
+
+    def dedupe(self):
+        """優先度の高いセグメントに既出の事実（行）を、低いセグメントから除く"""
+        seen = set()
+        for segment in sorted(self.segments, key=lambda s: -s['priority']):
+            kept = []
+            for line in segment['lines']:
+                key = _fact_key(line)
+                if key and key in seen and not segment['required']:
+                    continue
+                if key:
+                    seen.add(key)
+                kept.append(line)
+            segment['lines'] = kept
+
+    def fit(self) -> dict:
+        """重複除去のうえ、予算を超える分を優先度の低いセグメントの末尾の行から削る"""
+        self.dedupe()
+        total = sum(self._tokens(s) for s in self.segments)
+        for segment in sorted(self.segments, key=lambda s: s['priority']):
+            if total <= self.budget:
+                break
+            if segment['required']:
+                continue
+            before = self._tokens(segment)
+            while segment['lines'] and total - before + self._tokens(segment) > self.budget:
+                segment['lines'].pop()
+                _strip_trailing_headings(segment['lines'])
+                if _is_heading_only(segment['lines']):
+                    segment['lines'] = []
+            total += self._tokens(segment) - before
+
+        if total > self.budget:
+            logger.warning(f'プロンプトが予算を超過: {total} / {self.budget} トークン（必須セグメントのみ）')
+        return {s['name']: '\n'.join(s['lines']) for s in self.segments}
+
+    def metrics(self) -> dict:
+        """セグメントごとの削減前後のトークン数"""
+        return {
+            'budget': self.budget,
+            'segments': {
+                s['name']: {'tokens_in': s['tokens_in'], 'tokens_out': self._tokens(s)}
+                for s in self.segments
+            },
+            'tokens_in': sum(s['tokens_in'] for s in self.segments),
+            'tokens_out': sum(self._tokens(s) for s in self.segments),
+        }
+
+
+def record_prompt_metrics(metrics: dict, path=PROMPT_METRICS_PATH, **extra):
+    """プロンプトのトークン数を JSON Lines で追記"""
+    entry = {'timestamp': datetime.now().isoformat(), **extra, **metrics}
+    try:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    except Exception as e:
+        logger.warning(f'プロンプト計測の記録失敗: {str(e)[:50]}')
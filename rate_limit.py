@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+外部 API 呼び出し用のレート制御ユーティリティ
+- トークンバケットによるリクエスト間隔の制御
+- 429（レート制限）時のジッター付き指数バックオフ
+- 一連の取得処理全体の時間予算
+- Gemini のリクエスト数 / トークン数（毎分）のクォータ
+"""
+
+import time
+import random
+import logging
+import threading
+
+from prompt_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class BudgetExceeded(Exception):
+    """時間予算内にリクエストを実行できなかった"""
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット（rate: 1秒あたりの補充数、capacity: バースト上限）"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """トークンを取得できれば 0 を、できなければ必要な待ち秒数を返す"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: float = None) -> bool:
+        """トークンを取得できるまで待機（timeout 秒を超える場合は False）"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """ジッター付き指数バックオフの待ち秒数（full jitter）"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def parse_retry_after(headers) -> float:
+    """Retry-After ヘッダー（秒指定）を返す。無い・解釈できない場合は 0"""
+    try:
+        return float((headers or {}).get('Retry-After', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def retry_after_seconds(exc: Exception) -> float:
+    """例外に紐づくレスポンスの Retry-After ヘッダー（秒）を返す"""
+    response = getattr(exc, 'response', None)
+    return parse_retry_after(getattr(response, 'headers', None))
+
+
+class RequestScheduler:
+    """トークンバケット + 429 バックオフ + 時間予算でリクエストを実行するスケジューラ"""
+
+    def __init__(self, bucket: TokenBucket, is_retryable=None, max_retries: int = 4,
+                 base_delay: float = 2.0, max_delay: float = 60.0, budget: float = None):
+        self.bucket = bucket
+        self.is_retryable = is_retryable or (lambda exc: False)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self._deadline = None
+
+    def start(self):
+        """時間予算の計測を開始"""
+        self._deadline = None if self.budget is None else time.monotonic() + self.budget
+        return self
+
+    def remaining(self) -> float:
+        """残り時間（秒）。予算なしの場合は None"""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def call(self, func, *args, **kwargs):
+        """レート制御とリトライ付きで func を実行"""
+        attempt = 0
+        while True:
+            if not self.bucket.acquire(timeout=self.remaining()):
+                raise BudgetExceeded('時間予算内にリクエスト枠を確保できませんでした')
+
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not self.is_retryable(e) or attempt >= self.max_retries:
+                    raise
+
+                delay = max(backoff_delay(attempt, self.base_delay, self.max_delay),
+                            retry_after_seconds(e))
+                remaining = self.remaining()
+                if remaining is not None and delay >= remaining:
+                    raise BudgetExceeded('バックオフ待機が時間予算を超えるため中断します') from e
+
+                logger.warning(f'レート制限を検出: {delay:.1f}秒後に再試行します（{attempt + 1}/{self.max_retries}）')
+                time.sleep(delay)
+                attempt += 1
+
+
+class GeminiQuota:
+    """Gemini API の毎分リクエスト数・毎分トークン数を複数スレッドで共有して制御"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute / 60.0, requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+
+    # プロンプトのトークン予算と同じ概算を使う
+    estimate_tokens = staticmethod(estimate_tokens)
+
+    def acquire(self, tokens: int, timeout: float = None) -> bool:
+        """1リクエスト分と tokens 分の枠を確保するまで待機"""
+        tokens = min(tokens, self.tokens.capacity)
+        if not self.requests.acquire(1, timeout=timeout):
+            return False
+        return self.tokens.acquire(tokens, timeout=timeout)
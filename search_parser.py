@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google 検索結果ページのストリーミングパーサー（標準ライブラリの html.parser のみ使用）
+1回の走査で各結果のタイトル・URL・ドメイン・スニペットを取り出し、
+対象ドメイン（config.TARGET_DOMAINS から選んだもの）の結果だけを残す
+
+- 結果リンクは <h3> を含むリンク、または /url?q= 形式のリダイレクトリンク（JS 無し版のページ）
+- スニペットは結果リンクの後のテキストブロック（リンク・<cite> のパンくずを除く）のうち
+  SNIPPET_MIN_CHARS 文字以上の最初のもの（「他の人はこちらも質問」等の後続ボックスを拾わないため。無ければ最長）
+- 必要件数に達したらそれ以降のチャンクは読まない
+"""
+
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, parse_qs
+
+SEARCH_MAX_RESULTS = 5
+SEARCH_CHUNK_SIZE = 8192
+SNIPPET_MIN_CHARS = 30
+
+# テキストを読まない要素
+SKIP_TAGS = {'script', 'style', 'noscript', 'svg', 'cite'}
+
+# スニペットのブロック境界
+BLOCK_TAGS = {'div', 'p', 'li', 'td', 'tr', 'table', 'br', 'h3'}
+
+# 検索エンジン自身のリンク（結果として扱わない）
+_SEARCH_HOSTS = re.compile(r'(^|\.)(google\.[a-z.]+|googleusercontent\.com|gstatic\.com|youtube\.com)$')
+_SPACES = re.compile(r'\s+')
+
+
+def result_url(href: str) -> str:
+    """結果リンクの実 URL（/url?q= のリダイレクトは展開、外部 http(s) 以外は空文字）"""
+    if not href:
+        return ''
+    parts = urlsplit(href)
+    if parts.path == '/url' and (not parts.netloc or _SEARCH_HOSTS.search(parts.netloc.lower())):
+        query = parse_qs(parts.query)
+        href = (query.get('q') or query.get('url') or [''])[0]
+        parts = urlsplit(href)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return ''
+    if _SEARCH_HOSTS.search(parts.hostname or ''):
+        return ''
+    return href
+
+
+def match_domain(url: str, domains: list) -> str:
+    """URL のホストが属する対象ドメイン（サブドメインも一致、該当なしは空文字）"""
+    host = (urlsplit(url).hostname or '').lower()
+    for domain in domains:
+        if host == domain or host.endswith('.' + domain):
+            return domain
+    return ''
+
+
+class SearchResultParser(HTMLParser):
+    """検索結果 HTML をチャンク単位で受け取り、対象ドメインの結果を集める"""
+
+    def __init__(self, domains: list, max_results: int = SEARCH_MAX_RESULTS):
+        super().__init__(convert_charrefs=True)
+        self.domains = [d.lower() for d in domains]
+        self.max_results = max_results
+        self.results = []
+        self.done = False
+        self._seen_urls = set()
+        self._skip_depth = 0
+        # 読み取り中のリンク: {'url', 'redirect', 'has_h3', 'blocks'}
+        self._anchor = None
+        # 直前の結果（スニペット収集中）と、そのテキストブロック
+        self._current = None
+        self._blocks = []
+        self._block = []
+
+    # --- HTMLParser ハンドラ ---
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag in BLOCK_TAGS:
+            self._end_block()
+        if tag == 'a':
+            href = dict(attrs).get('href') or ''
+            url = result_url(href)
+            self._anchor = {'url': url, 'redirect': href.startswith('/url?'), 'has_h3': False, 'blocks': ['']} if url else None
+        elif tag == 'h3' and self._anchor is not None:
+            self._anchor['has_h3'] = True
+            self._anchor['blocks'] = ['']
+
+    def handle_startendtag(self, tag, attrs):
+        if not self.done and tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if tag == 'a' and self._anchor is not None:
+            anchor, self._anchor = self._anchor, None
+            # タイトルはリンク内の最初のテキストブロック（<h3> があればその中身）
+            title = next((t for t in map(_clean, anchor['blocks']) if t), '')
+            if title and (anchor['has_h3'] or anchor['redirect']):
+                self._start_result(anchor['url'], title)
+        elif tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if self.done or self._skip_depth:
+            return
+        if self._anchor is not None:
+            self._anchor['blocks'][-1] += data
+        elif self._current is not None:
+            self._block.append(data)
+
+    # --- 結果の組み立て ---
+
+    def _end_block(self):
+        if self._anchor is not None:
+            self._anchor['blocks'].append('')
+            return
+        text = _clean(''.join(self._block))
+        if text:
+            self._blocks.append(text)
+        self._block = []
+
+    def _start_result(self, url: str, title: str):
+        """新しい結果リンクで直前の結果を確定し、次の結果のスニペット収集を始める"""
+        self._finish_result()
+        if self.done:
+            return
+        domain = match_domain(url, self.domains)
+        if domain and url not in self._seen_urls:
+            self._seen_urls.add(url)
+            # 対象外ドメインの結果はスニペットも読み捨てる
+            self._current = {'title': title, 'url': url, 'domain': domain, 'snippet': ''}
+        else:
+            self._current = None
+
+    def _finish_result(self):
+        self._end_block()
+        if self._current is not None:
+            self._current['snippet'] = next(
+                (b for b in self._blocks if len(b) >= SNIPPET_MIN_CHARS),
+                max(self._blocks, key=len, default='')
+            )
+            self.results.append(self._current)
+            if len(self.results) >= self.max_results:
+                self.done = True
+        self._current = None
+        self._blocks = []
+
+    def close(self):
+        super().close()
+        if not self.done:
+            self._finish_result()
+
+
+def _clean(text: str) -> str:
+    return _SPACES.sub(' ', text).strip()
+
+
+def _chunks(html, chunk_size: int):
+    if isinstance(html, str):
+        for start in range(0, len(html), chunk_size):
+            yield html[start:start + chunk_size]
+    else:
+        yield from html
+
+
+def parse_search_results(html, domains: list, max_results: int = SEARCH_MAX_RESULTS,
+                         chunk_size: int = SEARCH_CHUNK_SIZE) -> list:
+    """
+    検索結果ページから対象ドメインの結果を最大 max_results 件抽出
+    html は文字列、またはテキストチャンクのイテラブル（ストリーミング応答）
+    戻り値: [{'title', 'url', 'domain', 'snippet'}, ...]（ページ上の順）
+    """
+    parser = SearchResultParser(domains, max_results)
+    for chunk in _chunks(html, chunk_size):
+        parser.feed(chunk)
+        if parser.done:
+            break
+    parser.close()
+    return parser.results[:max_results]
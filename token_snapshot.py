@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+「主要なRWAプロジェクト群」セクションの決定的レンダラー
+厳選50銘柄の分類は config.RWA_TOKENS にそのまま存在するため、LLM に書かせずに
+config と最新のマーケットスナップショットから HTML を組み立てる
+
+- スナップショットが無い銘柄・分類は名前のみ表示
+- 分類ごとの集計（時価総額合計・時価総額加重の 24h 変化率）はトークン単位のデータから計算
+- insert_snapshot_section() で LLM 記事の「長期投資家向けの視点」（無ければ「結論」）の直前に差し込む
+- config.py が無い場合はセクションを出さない
+"""
+
+import re
+from html import escape
+
+try:
+    import config
+except ImportError:
+    config = None
+
+SNAPSHOT_HEADING = '主要なRWAプロジェクト群'
+
+# 差し込み位置（この見出しの直前）。見つからなければ記事末尾に追加
+SNAPSHOT_ANCHOR = re.compile(r'<h2[^>]*>[^<]*(?:長期投資家|結論)')
+
+
+def _format_usd(value: float) -> str:
+    if value >= 1e9:
+        return f'${value / 1e9:.1f}B'
+    if value >= 1e6:
+        return f'${value / 1e6:.0f}M'
+    return f'${value:,.0f}'
+
+
+def _category_summary(symbols: list, market: dict) -> dict:
+    """分類内の時価総額合計・時価総額加重の 24h 変化率・変化率上位"""
+    members = [market[s] for s in symbols if s in market]
+    market_cap = sum(m.get('market_cap') or 0 for m in members)
+    weighted = [(m.get('market_cap') or 0, m['change_24h']) for m in members if m.get('change_24h') is not None]
+    total_weight = sum(w for w, _ in weighted)
+    movers = sorted(
+        (s for s in symbols if s in market and market[s].get('change_24h') is not None),
+        key=lambda s: market[s]['change_24h'], reverse=True
+    )
+    return {
+        'market_cap': market_cap,
+        'change_24h': sum(w * c for w, c in weighted) / total_weight if total_weight > 0 else None,
+        'top_mover': movers[0] if movers else None,
+    }
+
+
+def render_snapshot_body(snapshot: dict = None, tokens: dict = None) -> str:
+    """セクション本文（見出しなし）の HTML"""
+    tokens = tokens or (config.RWA_TOKENS if config else {})
+    if not tokens:
+        return ''
+    market = (snapshot or {}).get('tokens') or {}
+    total = sum(len(members) for members in tokens.values())
+
+    fetched_at = (snapshot or {}).get('fetched_at')
+    basis = f'（市場データ: {fetched_at[:16].replace("T", " ")} 時点）' if market and fetched_at else ''
+    parts = [
+        f'<p>RWA セクターは単一の市場ではなく、厳選{total}銘柄を{len(tokens)}つの分類で整理しています{basis}。</p>',
+        '<ul>',
+    ]
+
+    for category, members in tokens.items():
+        symbols = [t['symbol'] for t in members]
+        stats = [f'{len(members)}銘柄']
+        summary = _category_summary(symbols, market)
+        if summary['market_cap'] > 0:
+            stats.append(f"時価総額 {_format_usd(summary['market_cap'])}")
+        if summary['change_24h'] is not None:
+            stats.append(f"24h {summary['change_24h']:+.1f}%")
+
+        names = ', '.join(f"{escape(t['name'])}（{escape(t['symbol'])}）" for t in members)
+        line = f"  <li><strong>{escape(category)}</strong>（{'・'.join(stats)}）: {names}"
+        if summary['top_mover']:
+            mover = summary['top_mover']
+            line += f"<br>24h 変化率上位: {escape(mover)} {market[mover]['change_24h']:+.1f}%"
+        parts.append(line + '</li>')
+
+    parts.append('</ul>')
+    return '\n'.join(parts)
+
+
+def render_snapshot_section(snapshot: dict = None, tokens: dict = None) -> str:
+    """見出し付きのセクション HTML（銘柄情報が無ければ空文字）"""
+    body = render_snapshot_body(snapshot, tokens)
+    if not body:
+        return ''
+    return f'<h2>{SNAPSHOT_HEADING}</h2>\n\n{body}\n\n'
+
+
+def insert_snapshot_section(article_html: str, section_html: str) -> str:
+    """記事の「長期投資家向けの視点」（無ければ「結論」）見出しの直前に差し込む"""
+    if not section_html:
+        return article_html
+    match = SNAPSHOT_ANCHOR.search(article_html or '')
+    if not match:
+        return f'{article_html}\n\n{section_html}'
+    return article_html[:match.start()] + section_html + article_html[match.start():]
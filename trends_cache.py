@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Trends 結果のディスクキャッシュ（TTL + stale-while-revalidate）
+キー: (keyword, timeframe, geo, hl, tz)
+TTL 内は新鮮なデータとして返し、TTL 超過後も猶予期間内は古いデータを即座に返しつつ
+バックグラウンドで再取得する
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(os.getenv('TRENDS_CACHE_PATH', '.cache/trends_cache.json'))
+
+# 新鮮とみなす期間（秒）: 08:00 / 18:00 の2回の実行をまたげる長さ
+DEFAULT_TTL = int(os.getenv('TRENDS_CACHE_TTL', str(12 * 3600)))
+
+# TTL 超過後も古いデータを返してよい猶予期間（秒）
+DEFAULT_STALE_TTL = int(os.getenv('TRENDS_CACHE_STALE_TTL', str(24 * 3600)))
+
+FRESH = 'fresh'
+STALE = 'stale'
+MISS = 'miss'
+
+
+class TrendsCache:
+    """キーワード単位のトレンド値（アンカー比の時系列）を JSON ファイルに保存するキャッシュ"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl: int = DEFAULT_TTL,
+                 stale_ttl: int = DEFAULT_STALE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._entries = None
+        self._refresh_thread = None
+
+    @staticmethod
+    def make_key(keyword: str, timeframe: str, geo: str, hl: str, tz: int) -> str:
+        """キャッシュキーを生成"""
+        return json.dumps([keyword, timeframe, geo, hl, tz], ensure_ascii=False)
+
+    def _load(self) -> dict:
+        """キャッシュファイルを読み込む（初回のみ）"""
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except FileNotFoundError:
+                self._entries = {}
+            except Exception as e:
+                logger.warning(f'トレンドキャッシュ読み込み失敗: {str(e)[:50]}')
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        """期限切れエントリを除いてアトミックに書き出す"""
+        now = time.time()
+        limit = self.ttl + self.stale_ttl
+        self._entries = {
+            key: entry for key, entry in self._entries.items()
+            if now - entry.get('fetched_at', 0) <= limit
+        }
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f'トレンドキャッシュ保存失敗: {str(e)[:50]}')
+
+    def get(self, key: str) -> tuple:
+        """(値, 状態) を返す。状態は 'fresh' / 'stale' / 'miss'"""
+        with self._lock:
+            entry = self._load().get(key)
+
+        if not entry:
+            return None, MISS
+
+        age = time.time() - entry.get('fetched_at', 0)
+        if age <= self.ttl:
+            return entry['value'], FRESH
+        if age <= self.ttl + self.stale_ttl:
+            return entry['value'], STALE
+        return None, MISS
+
+    def set_many(self, values: dict):
+        """複数キーの値をまとめて保存"""
+        if not values:
+            return
+
+        now = time.time()
+        with self._lock:
+            entries = self._load()
+            for key, value in values.items():
+                entries[key] = {'value': value, 'fetched_at': now}
+            self._save()
+
+    def refresh_in_background(self, refresher) -> bool:
+        """古いエントリの再取得をバックグラウンドで開始（実行中なら何もしない）"""
+        with self._lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return False
+
+            def _run():
+                try:
+                    refresher()
+                except Exception as e:
+                    logger.warning(f'トレンドキャッシュのバックグラウンド更新失敗: {str(e)[:50]}')
+
+            self._refresh_thread = threading.Thread(
+                target=_run, name='trends-cache-refresh', daemon=True
+            )
+            self._refresh_thread.start()
+            return True
+
+    def wait_for_refresh(self, timeout: float = None):
+        """バックグラウンド更新の完了を待つ（プロセス終了前の書き込み完了用）"""
+        thread = self._refresh_thread
+        if thread and thread.is_alive():
+            logger.info('トレンドキャッシュのバックグラウンド更新を待機中...')
+            thread.join(timeout)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Trends バッチ取得モジュール
+pytrends の1ペイロード（最大5キーワード）に複数キーワードを詰めて取得し、
+共通のアンカーキーワードでバッチ間のスコア（0-100）を正規化する
+
+- キャッシュにはアンカー比の時系列を保存し、0-100 への変換は要求されたキーワード全体で読み出し時に行う
+"""
+
+import os
+import logging
+import threading
+
+from trends_cache import TrendsCache, FRESH, STALE
+from rate_limit import TokenBucket, RequestScheduler, BudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+# pytrends が1回の build_payload で受け付けるキーワード数の上限
+MAX_KEYWORDS_PER_PAYLOAD = 5
+
+# バッチ間の比較基準にするアンカーキーワード（全バッチに含める）
+DEFAULT_ANCHOR = 'RWA'
+
+# リクエスト間隔（1分あたりのリクエスト数）とバースト上限
+TRENDS_REQUESTS_PER_MINUTE = float(os.getenv('TRENDS_REQUESTS_PER_MINUTE', '10'))
+TRENDS_BURST = 2
+
+# 1回の取得処理全体の時間予算（秒）
+TRENDS_FETCH_BUDGET = float(os.getenv('TRENDS_FETCH_BUDGET', '75'))
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    """pytrends の例外が 429（Too Many Requests）によるものか判定"""
+    if type(exc).__name__ == 'TooManyRequestsError':
+        return True
+    response = getattr(exc, 'response', None)
+    return getattr(response, 'status_code', None) == 429
+
+
+def chunk_keywords(keywords: list, anchor: str,
+                   batch_size: int = MAX_KEYWORDS_PER_PAYLOAD) -> list:
+    """アンカーを先頭に含む、batch_size 以下のキーワードバッチに分割"""
+    others = [kw for kw in dict.fromkeys(keywords) if kw != anchor]
+    per_batch = max(1, batch_size - 1)
+
+    if not others:
+        return [[anchor]]
+
+    return [
+        [anchor] + others[i:i + per_batch]
+        for i in range(0, len(others), per_batch)
+    ]
+
+
+def relative_batches(batches: list, anchor: str) -> tuple:
+    """
+    バッチごとの時系列をアンカーの平均値に対する比率に変換（バッチ・実行をまたいで同じスケール）
+    アンカーの関心度がゼロのバッチは比較基準が無いため、他のバッチの基準で近似し「比較不能」として返す
+
+    batches: [{keyword: [値, ...]}, ...]（各バッチは Google 側で個別に 0-100 正規化済み）
+    戻り値: ({keyword: [比率, ...]}, 比較不能なキーワードの集合)
+    """
+    anchor_means = []
+    for series_by_keyword in batches:
+        anchor_series = series_by_keyword.get(anchor) or []
+        anchor_means.append(sum(anchor_series) / len(anchor_series) if anchor_series else 0.0)
+    reference = next((mean for mean in anchor_means if mean > 0), None)
+
+    relative = {}
+    uncomparable = set()
+    for series_by_keyword, anchor_mean in zip(batches, anchor_means):
+        if anchor_mean > 0:
+            divisor = anchor_mean
+        else:
+            if series_by_keyword:
+                logger.warning(f'アンカー "{anchor}" の値が 0 のため、バッチを未補正で使用します')
+            divisor = reference or 1.0
+            uncomparable.update(kw for kw in series_by_keyword if kw != anchor)
+
+        for keyword, series in series_by_keyword.items():
+            if keyword == anchor and keyword in relative:
+                continue
+            relative[keyword] = [value / divisor for value in series]
+
+    return relative, uncomparable
+
+
+def peak_scores(relative: dict) -> dict:
+    """比率の時系列を、渡された全キーワード中の最大値を 100 とした最新値（0-100）に変換"""
+    peak = max((max(series) for series in relative.values() if series), default=0.0)
+    if peak <= 0:
+        return {keyword: 0 for keyword in relative}
+
+    return {
+        keyword: int(round(series[-1] / peak * 100)) if series else 0
+        for keyword, series in relative.items()
+    }
+
+
+def normalize_batches(batches: list, anchor: str) -> dict:
+    """バッチごとの時系列をアンカー基準で同一スケールに揃え、最新値を 0-100 で返す"""
+    return peak_scores(relative_batches(batches, anchor)[0])
+
+
+class BatchedTrendsFetcher:
+    """複数キーワードをまとめて Google Trends から取得するフェッチャー"""
+
+    def __init__(self, client=None, timeframe: str = 'now 7-d', geo: str = 'JP',
+                 hl: str = 'ja-JP', tz: int = 540, anchor: str = DEFAULT_ANCHOR,
+                 cache: TrendsCache = None, bucket: TokenBucket = None,
+                 budget: float = TRENDS_FETCH_BUDGET):
+        self.timeframe = timeframe
+        self.geo = geo
+        self.hl = hl
+        self.tz = tz
+        self.anchor = anchor
+        self.cache = cache
+        self.budget = budget
+        # バックグラウンド更新を含め、同じフェッチャーのリクエストは1つのバケットで間隔制御する
+        self.bucket = bucket or TokenBucket(TRENDS_REQUESTS_PER_MINUTE / 60.0, TRENDS_BURST)
+        self._client = client
+        # バックグラウンド更新と同じ pytrends セッションを同時に使わないためのロック
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """pytrends クライアント（初回アクセス時に生成）"""
+        if self._client is None:
+            from pytrends.request import TrendReq
+            self._client = TrendReq(hl=self.hl, tz=self.tz)
+        return self._client
+
+    def _fetch_batch(self, batch: list) -> dict:
+        """1ペイロード分のキーワードの時系列を取得"""
+        with self._client_lock:
+            self.client.build_payload(kw_list=batch, timeframe=self.timeframe, geo=self.geo)
+            interest_overtime = self.client.interest_over_time()
+
+        if interest_overtime.empty:
+            return {keyword: [] for keyword in batch}
+
+        return {
+            keyword: [float(v) for v in interest_overtime[keyword].tolist()]
+            if keyword in interest_overtime.columns else []
+            for keyword in batch
+        }
+
+    def _cache_key(self, keyword: str) -> str:
+        return TrendsCache.make_key(keyword, self.timeframe, self.geo, self.hl, self.tz)
+
+    def _fetch_relative(self, keywords: list) -> tuple:
+        """キャッシュを使わずにアンカー比の時系列を取得し、比較可能なものをキャッシュへ保存"""
+        batches = chunk_keywords(keywords, self.anchor)
+        logger.info(f'Google Trends バッチ取得: {len(keywords)} キーワード → {len(batches)} リクエスト')
+
+        scheduler = RequestScheduler(
+            self.bucket, is_retryable=is_rate_limited, budget=self.budget
+        ).start()
+
+        fetched = []
+        failed = []
+        for batch in batches:
+            try:
+                fetched.append(scheduler.call(self._fetch_batch, batch))
+            except BudgetExceeded as e:
+                logger.warning(f'{", ".join(batch)}: 時間予算切れのため取得を中断 - {e}')
+                failed.extend(kw for kw in batch if kw != self.anchor)
+            except Exception as e:
+                logger.warning(f'{", ".join(batch)}: トレンド取得失敗 - {str(e)[:50]}')
+                failed.extend(kw for kw in batch if kw != self.anchor)
+
+        relative, uncomparable = relative_batches(fetched, self.anchor)
+
+        # キャッシュにはアンカー比の時系列を保存し、0-100 への変換は読み出し時に行う
+        # （一部だけ再取得したキーワードもキャッシュ済みの値と同じスケールで比較できる）
+        # 取得に失敗したキーワード・アンカーが 0 のバッチの値はキャッシュしない
+        if self.cache:
+            self.cache.set_many({
+                self._cache_key(keyword): series
+                for keyword, series in relative.items()
+                if (keyword in keywords or keyword == self.anchor)
+                and keyword not in failed and keyword not in uncomparable
+            })
+
+        return relative, failed
+
+    def fetch_uncached(self, keywords: list) -> dict:
+        """キャッシュを使わずに取得し、結果をキャッシュへ保存"""
+        relative, _ = self._fetch_relative(keywords)
+        scores = peak_scores(relative)
+
+        # 呼び出し元が指定した順序・キーワードのみで返す（失敗したキーワードは 0）
+        return {keyword: scores.get(keyword, 0) for keyword in keywords}
+
+    def fetch(self, keywords: list) -> dict:
+        """キーワードごとのトレンドスコア（0-100、バッチ間で比較可能）を取得"""
+        if not self.cache:
+            return self.fetch_uncached(keywords)
+
+        relative = {}
+        stale = []
+        missing = []
+        # ピークの基準を揃えるため、アンカーの時系列も常に含める
+        for keyword in dict.fromkeys(list(keywords) + [self.anchor]):
+            value, state = self.cache.get(self._cache_key(keyword))
+            # 旧形式（0-100 のスコア）のエントリは未取得として扱う
+            if state in (FRESH, STALE) and isinstance(value, list):
+                relative[keyword] = value
+                if state == STALE:
+                    stale.append(keyword)
+            else:
+                missing.append(keyword)
+
+        logger.info(
+            f'トレンドキャッシュ: 新鮮 {len(relative) - len(stale)} / 期限切れ {len(stale)} / 未取得 {len(missing)}'
+        )
+
+        if missing:
+            fetched, _ = self._fetch_relative(missing)
+            relative.update(fetched)
+
+        if stale:
+            # 古いデータを即座に返し、再取得はバックグラウンドで行う
+            self.cache.refresh_in_background(lambda: self._fetch_relative(stale))
+
+        # 0-100 への変換は今回要求された全キーワード（+ アンカー）を対象に行う
+        scores = peak_scores(relative)
+        return {keyword: scores.get(keyword, 0) for keyword in keywords}
+
+if __name__ == "__main__":
+    demo_batches = [
+        {'RWA': [40, 50, 60], 'Ondo': [10, 20, 100]},
+        {'RWA': [20, 25, 30], 'PAXG': [50, 80, 100]},
+    ]
+    print(chunk_keywords(['Ondo', 'PAXG', 'RWA', 'MKR', 'USDe', 'tokenized assets'], 'RWA'))
+    print(normalize_batches(demo_batches, 'RWA'))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+コンテキストキャッシュ（context_cache.GeminiContextCache）の動作確認
+Gemini API は呼ばず、CachedContent の登録・取得を記録する代替オブジェクトに差し替えて
+登録 → プロセス内の再利用 → 台帳からの再利用（別プロセス相当）→ 期限切れ後の再登録 の流れと、
+最小トークン数未満・登録失敗時のローカル送信への切り替え、記事プロンプトのプレフィックスの安定性を確認する
+
+使い方:
+  python verify_context_cache.py
+"""
+
+import sys
+import types
+import logging
+import tempfile
+from pathlib import Path
+
+import context_cache
+from context_cache import GeminiContextCache, LocalPrefixModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'gemini-1.5-flash'
+TTL = 3600
+
+
+class FakeClock:
+    """context_cache が参照する time の代わり（期限切れを待たずに確認するため）"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeCaching:
+    """genai.caching の代わり: 登録した CachedContent を名前で保持し、呼び出し回数を数える"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.created = []
+        self.fetched = []
+        self.contents = {}
+        self.CachedContent = self
+
+    def create(self, model, display_name, contents, ttl):
+        if self.fail:
+            raise RuntimeError('Cached content is too small')
+        name = f'cachedContents/{len(self.created) + 1}'
+        self.created.append(name)
+        self.contents[name] = types.SimpleNamespace(name=name, model=model, contents=contents)
+        return self.contents[name]
+
+    def get(self, name):
+        self.fetched.append(name)
+        return self.contents[name]
+
+
+class FakeGenerativeModel:
+    @staticmethod
+    def from_cached_content(cached, generation_config=None):
+        return types.SimpleNamespace(cached_content=cached.name)
+
+
+def _check(results: list, name: str, ok: bool, detail: str = ''):
+    results.append(ok)
+    if ok:
+        logger.info(f'✅ {name}')
+    else:
+        logger.error(f'❌ {name}: {detail}')
+
+
+def verify_cache_path(results: list, root: Path):
+    clock = FakeClock()
+    caching = FakeCaching()
+    context_cache.time = clock
+    context_cache.genai = types.SimpleNamespace(caching=caching, GenerativeModel=FakeGenerativeModel)
+
+    registry = root / 'context_cache.json'
+    prefix = 'プレフィックス' * 50
+
+    # 登録
+    cache = GeminiContextCache(registry_path=registry, ttl=TTL, min_tokens=10)
+    model = cache.get_model(MODEL_NAME, prefix)
+    _check(results, '初回は CachedContent を登録', caching.created == ['cachedContents/1']
+           and model.cached_content == 'cachedContents/1', f'登録: {caching.created}')
+    _check(results, '台帳に保存', registry.exists())
+
+    # プロセス内の再利用
+    again = cache.get_model(MODEL_NAME, prefix)
+    _check(results, '同じプレフィックスはプロセス内で再利用', again is model and len(caching.created) == 1
+           and cache.hits == 1, f'登録 {len(caching.created)} 回・ヒット {cache.hits}')
+
+    # 台帳からの再利用（別プロセス相当）
+    restarted = GeminiContextCache(registry_path=registry, ttl=TTL, min_tokens=10)
+    model = restarted.get_model(MODEL_NAME, prefix)
+    _check(results, '再起動後は台帳の CachedContent を取得して再利用',
+           caching.fetched == ['cachedContents/1'] and len(caching.created) == 1
+           and model.cached_content == 'cachedContents/1', f'取得: {caching.fetched}・登録: {caching.created}')
+
+    # 期限切れ（期限の60秒前から作り直す）
+    clock.now += TTL - 30
+    model = restarted.get_model(MODEL_NAME, prefix)
+    _check(results, '期限切れ間近のキャッシュはプロセス内でも登録し直す',
+           caching.created == ['cachedContents/1', 'cachedContents/2']
+           and model.cached_content == 'cachedContents/2', f'登録: {caching.created}')
+
+    # 最小トークン数未満はローカル送信
+    small = GeminiContextCache(registry_path=registry, ttl=TTL, min_tokens=10**6)
+    _check(results, '最小トークン数未満はローカル送信',
+           isinstance(small.get_model(MODEL_NAME, prefix), LocalPrefixModel) and len(caching.created) == 2)
+
+    # 登録失敗時はローカル送信
+    caching.fail = True
+    failing = GeminiContextCache(registry_path=root / 'failing.json', ttl=TTL, min_tokens=10)
+    _check(results, '登録失敗時はローカル送信', isinstance(failing.get_model(MODEL_NAME, prefix), LocalPrefixModel))
+
+
+def verify_prefix_stability(results: list):
+    """データ量が変わっても記事プロンプトのプレフィックス（＝キャッシュのキー）が変わらないこと"""
+    from main import RWANewsGenerator
+
+    generator = RWANewsGenerator.__new__(RWANewsGenerator)
+    base = {
+        'fundamentals_context': '【RWA厳選50銘柄の分布】\n' + '\n'.join(f'  - 分類{i}: XDC, LINK, QNT' for i in range(200)),
+        'macro_context': '',
+        'macro_background': '',
+        'fundamentals_scores': '',
+    }
+    short = {**base, 'top_tier_news': {'domains': ['coindesk.com'], 'snippets': ['RWA']}}
+    long = {**base, 'top_tier_news': {
+        'domains': ['coindesk.com'], 'snippets': [f'RWA tokenized fund #{i}' for i in range(400)],
+    }}
+
+    prefixes = {generator._build_article_prompt({'RWA': 50}, inputs, token_budget)[0]
+                for inputs in (short, long) for token_budget in (None, 2000)}
+    _check(results, 'プレフィックスはニュース量・トークン予算に関わらず同じ', len(prefixes) == 1,
+           f'{len(prefixes)} 種類のプレフィックス')
+
+
+def main() -> int:
+    results = []
+    original_time, original_genai = context_cache.time, context_cache.genai
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            verify_cache_path(results, Path(root))
+    finally:
+        context_cache.time, context_cache.genai = original_time, original_genai
+    verify_prefix_stability(results)
+    return 0 if all(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
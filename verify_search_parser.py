@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+検索結果パーサーのゴールデンファイル検証
+samples/search/*.html（保存した検索結果ページ）を search_parser で解析し、
+同名の *.expected.json（対象ドメイン・期待する抽出結果）と比較する
+
+使い方:
+  python verify_search_parser.py           # 検証
+  python verify_search_parser.py --update  # 現在の抽出結果で期待値を書き直す（差分を目視確認してからコミット）
+"""
+
+import sys
+import json
+import logging
+from pathlib import Path
+
+from search_parser import parse_search_results, SEARCH_MAX_RESULTS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SAMPLES_DIR = Path(__file__).parent / 'samples' / 'search'
+
+# チャンク境界の位置に結果が左右されないことも確認する
+CHUNK_SIZES = [8192, 64, 7]
+
+
+def verify_page(html_path: Path, update: bool = False) -> bool:
+    expected_path = html_path.with_suffix('.expected.json')
+    with open(expected_path, 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    html = html_path.read_text(encoding='utf-8')
+    max_results = expected.get('max_results', SEARCH_MAX_RESULTS)
+
+    results = [parse_search_results(html, expected['domains'], max_results, chunk_size=size) for size in CHUNK_SIZES]
+
+    if update:
+        expected['results'] = results[0]
+        with open(expected_path, 'w', encoding='utf-8') as f:
+            json.dump(expected, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        logger.info(f'期待値を更新: {expected_path.name}（{len(results[0])} 件）')
+        return True
+
+    ok = True
+    for size, actual in zip(CHUNK_SIZES, results):
+        if actual != expected['results']:
+            ok = False
+            logger.error(f'❌ {html_path.name}（チャンク {size}）: 抽出結果が期待値と不一致')
+            for i, (want, got) in enumerate(zip(expected['results'], actual)):
+                if want != got:
+                    logger.error(f'  [{i}] 期待: {want}')
+                    logger.error(f'  [{i}] 実際: {got}')
+            if len(actual) != len(expected['results']):
+                logger.error(f'  件数: 期待 {len(expected["results"])} / 実際 {len(actual)}')
+    if ok:
+        logger.info(f'✅ {html_path.name}: {len(expected["results"])} 件一致')
+    return ok
+
+
+def main() -> int:
+    update = '--update' in sys.argv[1:]
+    pages = sorted(SAMPLES_DIR.glob('*.html'))
+    if not pages:
+        logger.error(f'検証用ページがありません: {SAMPLES_DIR}')
+        return 1
+    results = [verify_page(page, update) for page in pages]
+    return 0 if all(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())